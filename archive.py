@@ -0,0 +1,202 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+from datetime import datetime
+from config import ARCHIVE_ENABLED, ARCHIVE_DIR
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+# Kinds of content that are stored without compression (already compressed formats)
+UNCOMPRESSED_KINDS = ('image',)
+
+class RawArchive:
+    """
+    Content-addressed archive of everything a run fetched.
+
+    Bodies are stored once under objects/<hash[:2]>/<hash> (SHA-256 of the raw bytes),
+    compressed with zstd when the zstandard package is installed and gzip otherwise.
+    Each day has an index file, index/<YYYY-MM-DD>.json, mapping every fetched URL to
+    its hash, kind ("listing", "article", "image", "translation" or "article_info") and
+    codec, so a whole run can be replayed later without touching the network.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, enabled=ARCHIVE_ENABLED):
+        self.archive_dir = archive_dir
+        self.enabled = enabled
+        self.replay_date = None
+        self.date = datetime.now().strftime('%Y-%m-%d')
+        self.index = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'deduplicated': 0, 'replayed': 0, 'missing': 0}
+
+    @property
+    def replay(self):
+        """True when the archive is serving a past run instead of recording."""
+        return self.replay_date is not None
+
+    def _index_path(self, date):
+        return os.path.join(self.archive_dir, 'index', f"{date}.json")
+
+    def _object_path(self, digest, codec):
+        extension = {'zstd': '.zst', 'gzip': '.gz'}.get(codec, '')
+        return os.path.join(self.archive_dir, 'objects', digest[:2], f"{digest}{extension}")
+
+    def _load_index(self, date):
+        try:
+            with open(self._index_path(date), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def start_replay(self, date):
+        """
+        Switch the archive to replay mode for a past run.
+
+        Args:
+            date: Run date as YYYY-MM-DD
+
+        Raises:
+            FileNotFoundError: If nothing was archived on that date
+        """
+        if not os.path.exists(self._index_path(date)):
+            raise FileNotFoundError(f"No archive index for {date} in {self.archive_dir}")
+        self.replay_date = date
+        self.index = self._load_index(date)
+        print(f"Replaying archived run from {date}: {len(self.index)} archived resources")
+
+    def record(self, url, content, kind):
+        """
+        Store fetched content and index it under its URL for today's run.
+
+        Args:
+            url: URL (or pseudo-URL) the content was fetched from
+            content: Raw bytes
+            kind: "listing", "article", "image", "translation" or "article_info"
+
+        Returns:
+            str: SHA-256 of the content, or None if archiving is disabled
+        """
+        if not self.enabled or self.replay:
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        if kind in UNCOMPRESSED_KINDS:
+            codec = 'raw'
+        else:
+            codec = 'zstd' if zstandard else 'gzip'
+
+        path = self._object_path(digest, codec)
+        try:
+            if os.path.exists(path):
+                self.stats['deduplicated'] += 1
+            else:
+                if codec == 'zstd':
+                    data = zstandard.ZstdCompressor(level=10).compress(content)
+                elif codec == 'gzip':
+                    data = gzip.compress(content, compresslevel=6)
+                else:
+                    data = content
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self.stats['stored'] += 1
+        except OSError as e:
+            print(f"  ✗ Could not archive {url}: {str(e)}")
+            return None
+
+        with self._lock:
+            self.index[url] = {
+                'hash': digest,
+                'kind': kind,
+                'codec': codec,
+                'size': len(content),
+                'fetched_at': datetime.now().isoformat(),
+            }
+            self._dirty = True
+        return digest
+
+    def record_many(self, items, kind):
+        """
+        Store several pieces of content of one kind, e.g. the translations of a batch.
+
+        Args:
+            items: (url, content) tuples
+            kind: Kind of every item, as for record()
+        """
+        if not self.enabled or self.replay:
+            return
+        for url, content in items:
+            self.record(url, content, kind)
+
+    def get(self, url):
+        """
+        Read archived content for a URL from the loaded index.
+
+        Args:
+            url: URL (or pseudo-URL) to look up
+
+        Returns:
+            bytes: Archived content, or None if the URL was not archived
+        """
+        entry = self.index.get(url)
+        if not entry:
+            self.stats['missing'] += 1
+            return None
+
+        with open(self._object_path(entry['hash'], entry['codec']), 'rb') as f:
+            data = f.read()
+        if entry['codec'] == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Archive entry is zstd-compressed but the zstandard package is not installed")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        elif entry['codec'] == 'gzip':
+            data = gzip.decompress(data)
+        self.stats['replayed'] += 1
+        return data
+
+    def contains(self, url, kind=None):
+        """Check whether a URL is in the loaded index (optionally of a given kind)."""
+        entry = self.index.get(url)
+        return entry is not None and (kind is None or entry['kind'] == kind)
+
+    def urls(self, kind=None):
+        """Return archived URLs, optionally only those of one kind."""
+        return [url for url, entry in self.index.items() if kind is None or entry['kind'] == kind]
+
+    def save(self):
+        """Merge today's entries into the day's index file."""
+        if not self.enabled or self.replay or not self._dirty:
+            return
+        with self._lock:
+            index = self._load_index(self.date)
+            index.update(self.index)
+            path = self._index_path(self.date)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, path)
+            self._dirty = False
+        print(f"Archived {len(self.index)} resources to {path} "
+              f"({self.stats['stored']} new objects, {self.stats['deduplicated']} already stored)")
+
+# Shared archive used by the whole run
+raw_archive = RawArchive()
+
+def translation_key(text, source='en', target='gu'):
+    """Pseudo-URL under which a translation is archived."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"translation://{source}-{target}/{digest}"
+
+def article_info_key(url, source_hash):
+    """Pseudo-URL under which a finished article served from the article cache is archived."""
+    digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return f"article-info://{source_hash}/{digest}"
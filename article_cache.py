@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import hashlib
+from translation_planner import needs_translation
+from remote_cache import remote_cache
+from config import ARTICLE_CACHE_ENABLED, ARTICLE_CACHE_DIR, ARTICLE_CACHE_MAX_AGE_DAYS, REMOTE_CACHE_PREFETCH
+
+def article_source_hash(title, image_url, blocks):
+    """
+    Hash the extracted English source of an article.
+    
+    Args:
+        title: English article title
+        image_url: Featured image URL (or None)
+        blocks: English content blocks from extract_content_blocks
+    
+    Returns:
+        str: SHA-256 hex digest that changes whenever the source text changes
+    """
+    source = json.dumps({'title': title, 'image': image_url, 'blocks': blocks},
+                        sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+class ArticleCache:
+    """
+    Persistent cache of finished article_info dicts (translated titles, content
+    blocks and image), keyed by article URL and validated against the hash of
+    the extracted source text, so an unchanged article is never re-translated.
+    Entries missing on disk are looked up in the MongoDB cache tier (remote_cache).
+    """
+    
+    def __init__(self, cache_dir=ARTICLE_CACHE_DIR, max_age_days=ARTICLE_CACHE_MAX_AGE_DAYS,
+                 enabled=ARTICLE_CACHE_ENABLED, remote=remote_cache):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 24 * 3600
+        self.enabled = enabled
+        self.remote = remote
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'stored': 0, 'skipped': 0, 'remote_hits': 0}
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+    
+    def _path(self, url):
+        return os.path.join(self.cache_dir, f"{self._key(url)}.json")
+    
+    def _write(self, entry):
+        path = self._path(entry['url'])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def get(self, url, source_hash):
+        """
+        Return the cached article for a URL if its source text is unchanged.
+        
+        Args:
+            url: Article URL
+            source_hash: Hash of the freshly extracted source text
+        
+        Returns:
+            dict: Cached article_info, or None
+        """
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            key = self._key(url)
+            entry = self.remote.get_many('article', [key]).get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['remote_hits'] += 1
+            try:
+                self._write(entry)
+            except OSError:
+                pass
+        
+        if entry.get('source_hash') != source_hash:
+            self.stats['stale'] += 1
+            return None
+        self.stats['hits'] += 1
+        try:
+            os.utime(self._path(url))  # Mark as recently used for pruning
+        except OSError:
+            pass
+        return entry['article_info']
+    
+    def put(self, url, source_hash, article_info):
+        """
+        Store a finished article.
+        Articles where a translation fell back to the English text are not cached,
+        so they get another chance to be translated on the next run.
+        
+        Args:
+            url: Article URL
+            source_hash: Hash of the extracted source text
+            article_info: Finished article dictionary
+        """
+        if not self.enabled:
+            return
+        if not is_fully_translated(article_info):
+            self.stats['skipped'] += 1
+            return
+        
+        entry = {
+            'url': url,
+            'source_hash': source_hash,
+            'cached_at': time.time(),
+            'article_info': article_info,
+        }
+        try:
+            self._write(entry)
+            self.stats['stored'] += 1
+        except OSError as e:
+            print(f"  ✗ Could not write article cache entry for {url}: {str(e)}")
+        self.remote.put('article', self._key(url), entry)
+    
+    def prefetch(self, limit=REMOTE_CACHE_PREFETCH['article']):
+        """Copy the most recently updated articles of the MongoDB cache tier to disk."""
+        if not self.enabled:
+            return 0
+        copied = 0
+        for _, entry in self.remote.prefetch('article', limit):
+            if os.path.exists(self._path(entry['url'])):
+                continue
+            try:
+                self._write(entry)
+                copied += 1
+            except OSError:
+                pass
+        return copied
+    
+    def prune(self):
+        """Remove entries that have not been used within the maximum age."""
+        if not self.enabled:
+            return 0
+        removed = 0
+        cutoff = time.time() - self.max_age
+        for item in os.scandir(self.cache_dir):
+            if item.name.endswith('.json') and item.stat().st_mtime < cutoff:
+                try:
+                    os.remove(item.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+    
+    def report(self):
+        """Print the cache counters for this run."""
+        print("Article cache statistics:")
+        print(f"  • Hits: {self.stats['hits']} ({self.stats['remote_hits']} from the MongoDB cache tier)")
+        print(f"  • Misses: {self.stats['misses']}, changed since cached: {self.stats['stale']}")
+        print(f"  • Stored: {self.stats['stored']}, not cached (untranslated text): {self.stats['skipped']}")
+
+def is_fully_translated(article_info):
+    """
+    Check that every Gujarati block actually differs from its English source
+    (blocks the translation planner passes through unchanged are expected to match).
+    """
+    english_title = article_info.get('english_title')
+    if article_info.get('gujarati_title') == english_title and needs_translation(english_title or ''):
+        return False
+    content = article_info.get('content', [])
+    for gujarati_block, english_block in zip(content[0::2], content[1::2]):
+        if (english_block['text'] and gujarati_block['text'] == english_block['text'] and
+                needs_translation(english_block['text'])):
+            return False
+    return True
+
+# Shared cache used by the whole run
+article_cache = ArticleCache()
@@ -0,0 +1,469 @@
+"""
+Micro-benchmarks for the scraping pipeline, run against saved HTML pages.
+
+Save a few pages first (for example with "curl -o page1.html <url>"), then run:
+
+    python benchmark.py listing page1.html page2.html page3.html
+    python benchmark.py parse --scope article article1.html article2.html
+    python benchmark.py extract article1.html article2.html
+    python benchmark.py translate --latency 0.3 --rate 10 article1.html article2.html
+    python benchmark.py registry --urls 20000 --mongodb-uri mongodb://localhost:27017/
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from bs4 import BeautifulSoup
+from html_parsing import PARSER_BACKENDS, PARSE_SCOPES, get_parser_backend, parse_html
+from scraper import extract_listing_urls, should_include_url, extract_content_blocks
+from translation import TranslationService, translate_segments_async, translate_text_async
+from translation_backends import StubBackend
+from translation_stub import start_stub_server
+from host_governor import get_governor
+from db_utils import MongoConnectionManager, MongoUrlRegistry, SqliteUrlRegistry
+
+def legacy_extract_listing_urls(soup):
+    """
+    The original three-pass listing extractor, kept here as the benchmark baseline.
+    
+    Args:
+        soup: BeautifulSoup tree of a listing page
+    
+    Returns:
+        list: Article URLs in the order the three passes found them
+    """
+    page_urls = []
+    
+    # Method 1: Find divs with class="post-data"
+    for div in soup.find_all('div', class_='post-data'):
+        h3_tag = div.find('h3')
+        if h3_tag:
+            link = h3_tag.find('a')
+            if link and link.get('href'):
+                article_url = link['href']
+                if article_url not in page_urls and should_include_url(article_url):
+                    page_urls.append(article_url)
+    
+    # Method 2: Find divs with class="home-post-item"
+    for div in soup.find_all('div', class_='home-post-item'):
+        h3_tag = div.find('h3')
+        if h3_tag:
+            link = h3_tag.find('a')
+            if link and link.get('href'):
+                article_url = link['href']
+                if article_url not in page_urls and should_include_url(article_url):
+                    page_urls.append(article_url)
+    
+    # Method 3: Look for all h3 elements with links that look like articles
+    for div in soup.find_all('div'):
+        h3_elem = div.find('h3')
+        if h3_elem:
+            a_elem = h3_elem.find('a')
+            if a_elem and a_elem.get('href'):
+                article_url = a_elem['href']
+                if ('gktoday.in' in article_url and
+                    not article_url.endswith('/') and
+                    '/page/' not in article_url and
+                    article_url not in page_urls and
+                    should_include_url(article_url)):
+                    page_urls.append(article_url)
+    
+    return page_urls
+
+def legacy_extract_content_blocks(main_content):
+    """
+    The original decompose + find_all + ancestor-walk content extraction, kept
+    here as the benchmark baseline. It modifies main_content in place.
+    
+    Args:
+        main_content: Main article element
+    
+    Returns:
+        list: English content blocks in the same format as extract_content_blocks
+    """
+    # Remove unwanted sections
+    for class_name in ('sharethis-inline-share-buttons', 'related-articles'):
+        for div in main_content.find_all('div', class_=class_name):
+            div.decompose()
+    for element_id in ('comments', 'respond'):
+        section = main_content.find(id=element_id)
+        if section:
+            section.decompose()
+    for class_name in ('post-meta', 'breadcrumb'):
+        for div in main_content.find_all('div', class_=class_name):
+            div.decompose()
+    
+    article_content = main_content.find('div', class_='entry-content')
+    if not article_content:
+        article_content = main_content.find('div', class_='post-content')
+    if not article_content:
+        article_content = main_content
+    
+    content_elements = []
+    for tag in article_content.find_all(['p', 'h2', 'h4', 'ul', 'ol']):
+        should_skip = False
+        parent = tag.parent
+        for _ in range(3):
+            if not parent:
+                break
+            if parent.get('class'):
+                parent_classes = ' '.join(parent.get('class', []))
+                if any(cls in parent_classes for cls in [
+                    'sharethis', 'related-articles', 'comments', 'comment-respond',
+                    'post-meta', 'breadcrumb'
+                ]):
+                    should_skip = True
+                    break
+            parent_id = parent.get('id', '')
+            if any(id_name in parent_id for id_name in ['comments', 'respond']):
+                should_skip = True
+                break
+            parent = parent.parent
+        if should_skip:
+            continue
+        text = tag.get_text().strip()
+        if not text or len(text) < 10:
+            continue
+        content_elements.append(tag)
+    
+    if not content_elements:
+        content_elements = [p for p in main_content.find_all('p') if len(p.get_text().strip()) > 20]
+    
+    blocks = []
+    numbered_list_counter = 1
+    for tag in content_elements:
+        text = tag.get_text().strip()
+        if not text:
+            continue
+        if ('post-date' in text.lower() or 'post-categories' in text.lower() or
+            'breadcrumb' in text.lower() or 'itemscope' in text.lower() or
+            'schema.org' in text.lower() or 'fa fa-calendar' in text.lower() or
+            'fa fa-folder' in text.lower()):
+            continue
+        if tag.name == 'p':
+            blocks.append({'type': 'paragraph', 'text': text})
+        elif tag.name == 'h2':
+            blocks.append({'type': 'heading_2', 'text': text})
+        elif tag.name == 'h4':
+            blocks.append({'type': 'heading_4', 'text': text})
+        elif tag.name == 'ul':
+            for li in tag.find_all('li'):
+                blocks.append({'type': 'bullet_list', 'text': li.get_text().strip()})
+        elif tag.name == 'ol':
+            for li in tag.find_all('li'):
+                blocks.append({'type': 'numbered_list', 'text': li.get_text().strip(), 'number': numbered_list_counter})
+                numbered_list_counter += 1
+    
+    if not blocks:
+        for p in main_content.find_all('p')[:3]:
+            text = p.get_text().strip()
+            if text and len(text) > 20:
+                blocks.append({'type': 'paragraph', 'text': text})
+    
+    return blocks
+
+def find_main_content(content):
+    """Parse an article page and return its main content element."""
+    soup = parse_html(content, scope='article')
+    return (soup.find('main', id='main', class_='site-main') or
+            soup.find('div', class_='inside_post column content_width'))
+
+def time_call(func, *args, repeat=5):
+    """
+    Time a function call several times.
+    
+    Args:
+        func: Function to call
+        *args: Arguments passed to the function
+        repeat: Number of timed runs
+    
+    Returns:
+        tuple: (median seconds, result of the last call)
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+def read_pages(paths):
+    """Read saved HTML files as bytes."""
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+    return pages
+
+def benchmark_listing(args):
+    """Compare the legacy and single-pass listing extractors on saved listing pages."""
+    print(f"{'page':<40} {'parse ms':>10} {'legacy ms':>10} {'single ms':>10} {'speedup':>8} {'urls':>6}")
+    totals = [0.0, 0.0, 0.0]
+    for path, content in read_pages(args.files):
+        parse_time, soup = time_call(BeautifulSoup, content, 'html.parser', repeat=args.repeat)
+        legacy_time, legacy_urls = time_call(legacy_extract_listing_urls, soup, repeat=args.repeat)
+        single_time, single_urls = time_call(extract_listing_urls, soup, repeat=args.repeat)
+        
+        totals[0] += parse_time
+        totals[1] += legacy_time
+        totals[2] += single_time
+        
+        speedup = legacy_time / single_time if single_time else float('inf')
+        print(f"{path[-40:]:<40} {parse_time*1000:>10.2f} {legacy_time*1000:>10.2f} "
+              f"{single_time*1000:>10.2f} {speedup:>7.1f}x {len(single_urls):>6}")
+        
+        if set(legacy_urls) != set(single_urls):
+            print(f"  ! URL sets differ: {len(set(legacy_urls) - set(single_urls))} only in legacy, "
+                  f"{len(set(single_urls) - set(legacy_urls))} only in single-pass")
+    
+    count = len(args.files)
+    print(f"\nAverage per page: parse {totals[0]/count*1000:.2f} ms, "
+          f"legacy extract {totals[1]/count*1000:.2f} ms, "
+          f"single-pass extract {totals[2]/count*1000:.2f} ms")
+
+def measure_peak_memory(func, *args):
+    """Return the peak Python memory allocated while running func, in bytes."""
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak
+
+def benchmark_parse(args):
+    """Compare parser backends, with and without scoped parsing, on saved pages."""
+    backends = [name for name in PARSER_BACKENDS if get_parser_backend(name) == name]
+    strainer = PARSE_SCOPES[args.scope]
+    pages = read_pages(args.files)
+    
+    print(f"Pages: {len(pages)}, scope: {args.scope}, backends: {', '.join(backends)}\n")
+    print(f"{'backend':<14} {'mode':<8} {'parse ms/page':>14} {'peak KiB/page':>14}")
+    for backend in backends:
+        for mode in ('full', 'scoped'):
+            parse_only = strainer if mode == 'scoped' else None
+            timings = []
+            peaks = []
+            for _, content in pages:
+                parse_time, _ = time_call(lambda c: BeautifulSoup(c, backend, parse_only=parse_only), content,
+                                          repeat=args.repeat)
+                timings.append(parse_time)
+                peaks.append(measure_peak_memory(lambda c: BeautifulSoup(c, backend, parse_only=parse_only), content))
+            print(f"{backend:<14} {mode:<8} {statistics.mean(timings)*1000:>14.2f} "
+                  f"{statistics.mean(peaks)/1024:>14.1f}")
+
+def benchmark_extract(args):
+    """Compare the legacy and single-pass content extractors on saved article pages."""
+    print(f"{'article':<40} {'legacy ms':>10} {'single ms':>10} {'speedup':>8} {'blocks':>7} {'match':>6}")
+    totals = [0.0, 0.0]
+    mismatches = 0
+    for path, content in read_pages(args.files):
+        if find_main_content(content) is None:
+            print(f"{path[-40:]:<40} main content not found, skipped")
+            continue
+        
+        # The legacy extractor modifies the tree, so each run gets a fresh parse
+        # and only the extraction itself is timed
+        legacy_timings = []
+        single_timings = []
+        for _ in range(args.repeat):
+            main_content = find_main_content(content)
+            start = time.perf_counter()
+            legacy_blocks = legacy_extract_content_blocks(main_content)
+            legacy_timings.append(time.perf_counter() - start)
+            
+            main_content = find_main_content(content)
+            start = time.perf_counter()
+            single_blocks = extract_content_blocks(main_content)
+            single_timings.append(time.perf_counter() - start)
+        
+        legacy_time = statistics.median(legacy_timings)
+        single_time = statistics.median(single_timings)
+        totals[0] += legacy_time
+        totals[1] += single_time
+        
+        match = legacy_blocks == single_blocks
+        if not match:
+            mismatches += 1
+        speedup = legacy_time / single_time if single_time else float('inf')
+        print(f"{path[-40:]:<40} {legacy_time*1000:>10.2f} {single_time*1000:>10.2f} "
+              f"{speedup:>7.1f}x {len(single_blocks):>7} {'yes' if match else 'NO':>6}")
+    
+    count = len(args.files)
+    print(f"\nAverage per article: legacy {totals[0]/count*1000:.2f} ms, single-pass {totals[1]/count*1000:.2f} ms")
+    print(f"Articles with different output: {mismatches}")
+
+def article_segments(content):
+    """Return the English title and content block texts of a saved article page."""
+    main_content = find_main_content(content)
+    if main_content is None:
+        return []
+    heading = main_content.find('h1')
+    title = [heading.get_text().strip()] if heading else []
+    return title + [block['text'] for block in extract_content_blocks(main_content)]
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def benchmark_translate(args):
+    """Measure translation throughput against the local stub server."""
+    articles = [article_segments(content) for _, content in read_pages(args.files)]
+    articles = [segments for segments in articles if segments]
+    segment_count = sum(len(segments) for segments in articles)
+    if not segment_count:
+        print("No article content found in the given files")
+        return
+    
+    server = None
+    url = args.url
+    if not url:
+        server = start_stub_server(latency=args.latency, jitter=args.jitter, rate=args.rate,
+                                   failure_rate=args.failure_rate)
+        url = f"http://127.0.0.1:{server.server_port}"
+    
+    backend = StubBackend(url=url)
+    latencies = []
+    errors = []
+    backend.add_hook('latency', lambda _, latency, count: latencies.append(latency))
+    backend.add_hook('error', lambda _, error: errors.append(error))
+    service = TranslationService(backend, workers=args.workers)
+    
+    async def translate_article(segments):
+        if args.no_batch:
+            return await asyncio.gather(*(translate_text_async(segment, service) for segment in segments))
+        return await translate_segments_async(segments, service)
+    
+    async def run():
+        try:
+            return await asyncio.gather(*(translate_article(segments) for segments in articles))
+        finally:
+            await service.close()
+    
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    
+    print(f"Articles: {len(articles)}, segments: {segment_count}, workers: {args.workers}, "
+          f"batching: {'off' if args.no_batch else 'on'}")
+    print(f"Requests: {len(latencies)} ok, {len(errors)} failed")
+    print(f"Throughput: {segment_count / elapsed:.1f} segments/sec ({elapsed:.2f} s total)")
+    if latencies:
+        print(f"Request latency: p50 {percentile(latencies, 0.5)*1000:.0f} ms, "
+              f"p99 {percentile(latencies, 0.99)*1000:.0f} ms")
+    metrics = get_governor(backend.host, backend.limits).metrics()
+    print(f"Governor: window {metrics['window']} (lowest {metrics['min_window']}), "
+          f"throttled {metrics['throttled']}, errors {metrics['errors']}")
+    if server:
+        print(f"Stub server: {server.stats}")
+        server.shutdown()
+
+def time_each(func, items):
+    """Call func on every item and return the latencies in seconds."""
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def benchmark_registry(args):
+    """Compare insert and lookup latency of the SQLite and MongoDB URL registries."""
+    temp_dir = tempfile.mkdtemp(prefix='registry-benchmark-')
+    registries = [SqliteUrlRegistry(path=os.path.join(temp_dir, 'scraped_urls.sqlite3'))]
+    if args.mongodb_uri:
+        manager = MongoConnectionManager(args.mongodb_uri, args.database, 'scraped_urls_benchmark')
+        registries.append(MongoUrlRegistry(manager))
+    
+    now = datetime.now()
+    urls = [f"https://www.gktoday.in/benchmark-article-{i}/" for i in range(args.urls)]
+    batches = [[{"url": url, "scraped_at": now} for url in urls[start:start + args.batch]]
+               for start in range(0, len(urls), args.batch)]
+    # Listing-sized candidate lists, half already scraped and half new
+    half = args.candidates // 2
+    candidates = [[urls[(i * half + j) % len(urls)] for j in range(half)] +
+                  [f"https://www.gktoday.in/benchmark-new-{i}-{j}/" for j in range(args.candidates - half)]
+                  for i in range(args.repeat)]
+    singles = urls[:args.repeat]
+    
+    print(f"URLs: {args.urls}, insert batch: {args.batch}, candidates per lookup: {args.candidates}")
+    print(f"{'registry':<10} {'operation':<22} {'count':>6} {'p50 ms':>9} {'p99 ms':>9} {'per sec':>10}")
+    for registry in registries:
+        if not registry.connect():
+            print(f"{registry.name:<10} not available, skipped")
+            continue
+        try:
+            results = [
+                ('batch insert', len(batches[0]), time_each(registry.save_many, batches)),
+                ('single upsert', 1, time_each(registry.save, singles)),
+                ('candidate lookup', args.candidates, time_each(registry.find_scraped, candidates)),
+                ('single lookup', 1, time_each(registry.is_scraped, singles)),
+            ]
+            for operation, size, latencies in results:
+                rate = size * len(latencies) / sum(latencies) if sum(latencies) else float('inf')
+                print(f"{registry.name:<10} {operation:<22} {len(latencies):>6} "
+                      f"{percentile(latencies, 0.5)*1000:>9.3f} {percentile(latencies, 0.99)*1000:>9.3f} "
+                      f"{rate:>10.0f}")
+        finally:
+            if isinstance(registry, MongoUrlRegistry):
+                registry.manager.connect()[1].drop()
+            registry.close()
+    
+    for name in os.listdir(temp_dir):
+        os.remove(os.path.join(temp_dir, name))
+    os.rmdir(temp_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper micro-benchmarks on saved HTML pages")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    listing_parser = subparsers.add_parser('listing', help="Listing page URL extraction")
+    listing_parser.add_argument('files', nargs='+', help="Saved listing page HTML files")
+    listing_parser.add_argument('--repeat', type=int, default=5, help="Timed runs per page")
+    listing_parser.set_defaults(func=benchmark_listing)
+    
+    parse_parser = subparsers.add_parser('parse', help="Parser backends and scoped parsing")
+    parse_parser.add_argument('files', nargs='+', help="Saved HTML files")
+    parse_parser.add_argument('--scope', choices=sorted(PARSE_SCOPES), default='article',
+                              help="Which scope to use for scoped parsing")
+    parse_parser.add_argument('--repeat', type=int, default=5, help="Timed runs per page")
+    parse_parser.set_defaults(func=benchmark_parse)
+    
+    extract_parser = subparsers.add_parser('extract', help="Article content extraction")
+    extract_parser.add_argument('files', nargs='+', help="Saved article page HTML files")
+    extract_parser.add_argument('--repeat', type=int, default=5, help="Timed runs per article")
+    extract_parser.set_defaults(func=benchmark_extract)
+    
+    translate_parser = subparsers.add_parser('translate', help="Translation throughput against the local stub")
+    translate_parser.add_argument('files', nargs='+', help="Saved article page HTML files")
+    translate_parser.add_argument('--url', help="Use a running stub server instead of starting one")
+    translate_parser.add_argument('--latency', type=float, default=0.2, help="Stub seconds per request")
+    translate_parser.add_argument('--jitter', type=float, default=0.1, help="Stub random extra seconds per request")
+    translate_parser.add_argument('--rate', type=float, default=0, help="Stub requests/sec before 429 (0 = unlimited)")
+    translate_parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of stub requests failing")
+    translate_parser.add_argument('--workers', type=int, default=4, help="Translation service workers")
+    translate_parser.add_argument('--no-batch', action='store_true', help="Send one request per segment")
+    translate_parser.set_defaults(func=benchmark_translate)
+    
+    registry_parser = subparsers.add_parser('registry', help="Scraped URL registry latency (SQLite vs MongoDB)")
+    registry_parser.add_argument('--urls', type=int, default=10000, help="URLs inserted before the lookups")
+    registry_parser.add_argument('--batch', type=int, default=500, help="URLs per batch insert")
+    registry_parser.add_argument('--candidates', type=int, default=50, help="URLs per candidate lookup")
+    registry_parser.add_argument('--repeat', type=int, default=200, help="Timed single upserts and lookups")
+    registry_parser.add_argument('--mongodb-uri', default='mongodb://localhost:27017/',
+                                 help="MongoDB to compare against (empty to benchmark SQLite only)")
+    registry_parser.add_argument('--database', default='gktoday_benchmark', help="MongoDB database for the benchmark")
+    registry_parser.set_defaults(func=benchmark_registry)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
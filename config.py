@@ -10,12 +10,93 @@ TELEGRAM_CHANNEL = os.environ.get("TELEGRAM_CHANNEL", "@CurrentAdda")
 BASE_URL = "https://www.gktoday.in/current-affairs/"
 PAGE_COUNT = 3  # Number of pages to scrape
 
+# Scraper HTTP settings
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+REQUEST_TIMEOUT = 20  # Seconds allowed for a single page request
+LISTING_CONCURRENCY = 5  # Maximum number of listing pages fetched at the same time
+ARTICLE_CONCURRENCY = int(os.environ.get('ARTICLE_CONCURRENCY', '3'))  # Articles processed at the same time
+ARTICLE_TIMEOUT = 600  # Seconds allowed for scraping and translating a single article
+
+# Per-host request governor: token bucket (rate requests/s, burst) plus an AIMD
+# concurrency window of at most max_window requests, shrunk when responses take longer
+# than target_latency seconds or the host answers 429/5xx
+DEFAULT_HOST_LIMITS = {'rate': 10, 'burst': 10, 'max_window': 8, 'target_latency': 2.0}
+HOST_LIMITS = {
+    'www.gktoday.in': {'rate': 5, 'burst': 5, 'max_window': 8, 'target_latency': 2.0},
+    'translate.google.com': {'rate': 2, 'burst': 2, 'max_window': 4, 'target_latency': 3.0},
+}
+FETCH_RETRIES = 3  # Attempts for a request the host answered with 429/5xx
+
+# HTML parsing: "lxml" (fast), "html.parser" (pure Python) or "html5lib"
+HTML_PARSER = os.environ.get('HTML_PARSER', 'lxml')
+HTML_SCOPED_PARSING = True  # Only build the listing containers / main article element
+
+# Crawl modes:
+# - "full" always scans PAGE_COUNT pages
+# - "incremental" stops as soon as INCREMENTAL_STOP_PAGES consecutive pages are already scraped
+# - "backfill" pages deep (BACKFILL_PAGE_COUNT) and checkpoints its progress so it can resume
+CRAWL_MODES = ('full', 'incremental', 'backfill')
+CRAWL_MODE = os.environ.get('CRAWL_MODE', 'incremental')
+INCREMENTAL_MAX_PAGES = 30  # Safety cap for incremental crawls
+INCREMENTAL_STOP_PAGES = 1  # Consecutive fully-known pages before an incremental crawl stops
+BACKFILL_PAGE_COUNT = 200  # Pages to walk in backfill mode
+
+# Article images are resized for the box they get in the PDF: the template shows them at
+# the full A4 content width (19cm = 718 CSS px) with max-height 180px and object-fit: cover
+IMAGE_BOX_WIDTH = 718  # CSS pixels
+IMAGE_BOX_MAX_HEIGHT = 180  # CSS pixels
+IMAGE_TARGET_DPI = int(os.environ.get('IMAGE_TARGET_DPI', '150'))
+IMAGE_JPEG_QUALITY = 82  # Photos are stored as JPEG, flat graphics as PNG
+IMAGE_WORKERS = max(1, min(4, os.cpu_count() or 1))  # Processes used for image decoding
+
 # PDF Generation settings
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
 PDF_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'output')
 
-# Create output directory if it doesn't exist
+CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache')
+
+# Create output and cache directories if they don't exist
 os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Progress file for backfill crawls
+BACKFILL_CHECKPOINT_FILE = os.path.join(CACHE_DIR, 'backfill_checkpoint.json')
+
+# HTTP cache for listing pages, articles and images (conditional GET + LRU eviction)
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', '1') != '0'
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, 'http')
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+# Cache of finished (translated) articles, keyed by URL and source text hash
+ARTICLE_CACHE_ENABLED = os.environ.get('ARTICLE_CACHE_ENABLED', '1') != '0'
+ARTICLE_CACHE_DIR = os.path.join(CACHE_DIR, 'articles')
+ARTICLE_CACHE_MAX_AGE_DAYS = 30
+
+# Translation backend: "google" (deep_translator) or "stub" (local test server, see translation_stub.py)
+TRANSLATION_BACKEND = os.environ.get('TRANSLATION_BACKEND', 'google')
+TRANSLATION_STUB_URL = os.environ.get('TRANSLATION_STUB_URL', 'http://127.0.0.1:8790')
+TRANSLATION_WORKERS = 4  # Translation requests in flight (further limited by the host governor)
+
+# Segment-level translation memory (SQLite), reused across runs
+TRANSLATION_MEMORY_ENABLED = os.environ.get('TRANSLATION_MEMORY_ENABLED', '1') != '0'
+TRANSLATION_MEMORY_PATH = os.path.join(CACHE_DIR, 'translation_memory.sqlite3')
+TRANSLATION_MEMORY_MAX_ENTRIES = 200000
+
+# Processed article images, stored by content hash and referenced from the HTML by file URL
+IMAGE_STORE_ENABLED = os.environ.get('IMAGE_STORE_ENABLED', '1') != '0'
+IMAGE_STORE_DIR = os.path.join(CACHE_DIR, 'images')
+IMAGE_STORE_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+
+# Local snapshot of the scraped URLs (Bloom filter + exact recent window), synced from MongoDB
+SEEN_SET_ENABLED = os.environ.get('SEEN_SET_ENABLED', '1') != '0'
+SEEN_SET_PATH = os.path.join(CACHE_DIR, 'seen_urls.bin')
+SEEN_SET_CAPACITY = 1000000  # URLs before the filter is rebuilt larger (about 1.8 MB)
+SEEN_SET_ERROR_RATE = 0.001
+SEEN_SET_RECENT_DAYS = 30
+
+# Raw archive of fetched pages, images and translations (used by main.py --replay)
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', '1') != '0'
+ARCHIVE_DIR = os.path.join(os.path.dirname(__file__), 'archive')
 
 # MongoDB configuration
 # Try to get MongoDB URI from environment variables with multiple possible names
@@ -43,3 +124,40 @@ if not MONGODB_URI:
     # Provide a fallback for development/testing
     MONGODB_URI = "mongodb://localhost:27017/"
     print(f"Using fallback MongoDB URI: {MONGODB_URI}")
+
+# Where scraped URLs are recorded: "mongodb" (the database above) or "sqlite"
+# (a local file, for single-node deployments and tests without a network hop)
+URL_REGISTRY_BACKEND = os.environ.get('URL_REGISTRY_BACKEND', 'mongodb')
+URL_REGISTRY_SQLITE_PATH = os.environ.get('URL_REGISTRY_SQLITE_PATH', os.path.join(CACHE_DIR, 'scraped_urls.sqlite3'))
+
+# Scraped URL records are buffered and written with one bulk write. When
+# SCRAPED_URL_COMMIT_ON_PUBLISH is on they are only written once the PDF has been
+# sent to Telegram, so articles of an edition that was never published are scraped
+# again next run; otherwise the buffer is flushed every SCRAPED_URL_BATCH_SIZE
+# records or SCRAPED_URL_FLUSH_INTERVAL seconds.
+SCRAPED_URL_COMMIT_ON_PUBLISH = os.environ.get('SCRAPED_URL_COMMIT_ON_PUBLISH', '1') != '0'
+SCRAPED_URL_BATCH_SIZE = 500
+SCRAPED_URL_FLUSH_INTERVAL = 30  # seconds
+SCRAPED_URL_WRITE_RETRIES = 3
+
+# Candidate URLs are checked against MongoDB in $in queries of this many URLs
+SEEN_CHECK_CHUNK_SIZE = 500
+
+# Second cache tier in MongoDB (MONGODB_DATABASE), so a fresh CI machine starts with
+# warm caches: translations and articles as documents, processed images in GridFS.
+# The most recently updated entries are prefetched into the local caches at startup.
+# Off by default with the sqlite URL registry, so single-node runs never touch the network.
+REMOTE_CACHE_ENABLED = os.environ.get('REMOTE_CACHE_ENABLED', '1' if URL_REGISTRY_BACKEND == 'mongodb' else '0') != '0'
+REMOTE_CACHE_PREFIX = 'cache'  # Collections cache_records and cache_blobs.files/.chunks
+REMOTE_CACHE_TTL_DAYS = 30
+REMOTE_CACHE_FLUSH_INTERVAL = 10  # Seconds between write-behind flushes
+REMOTE_CACHE_PREFETCH = {'translation': 20000, 'article': 300, 'image': 100}
+
+# Work-queue mode (main.py --queue): article jobs in a MongoDB collection that
+# several machines process. A claimed job is leased for WORK_QUEUE_LEASE_SECONDS
+# and heartbeated while it runs; an expired lease lets another worker take it over.
+WORK_QUEUE_COLLECTION = os.environ.get('WORK_QUEUE_COLLECTION', 'article_jobs')
+WORK_QUEUE_LEASE_SECONDS = 120
+WORK_QUEUE_MAX_ATTEMPTS = 3  # Claims of a job before it is marked failed
+WORK_QUEUE_POLL_INTERVAL = 5  # Seconds between checks while other workers hold the remaining jobs
+WORK_QUEUE_RETENTION_DAYS = 7  # Jobs are removed by a TTL index after this many days
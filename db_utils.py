@@ -1,127 +1,560 @@
+import time
+import sqlite3
 import pymongo
+import asyncio
+import atexit
+import threading
 from datetime import datetime
-from config import MONGODB_URI, MONGODB_DATABASE, MONGODB_COLLECTION
+from pymongo import UpdateOne
+from config import (MONGODB_URI, MONGODB_DATABASE, MONGODB_COLLECTION, SCRAPED_URL_COMMIT_ON_PUBLISH,
+                    SCRAPED_URL_BATCH_SIZE, SCRAPED_URL_FLUSH_INTERVAL, SCRAPED_URL_WRITE_RETRIES,
+                    SEEN_CHECK_CHUNK_SIZE, URL_REGISTRY_BACKEND, URL_REGISTRY_SQLITE_PATH)
 
-def get_mongodb_connection():
+class MongoConnectionManager:
     """
-    Establish a connection to MongoDB and return the collection for scraped URLs.
+    Process-wide MongoDB connection shared by every caller in a run.
     
-    Returns:
-        tuple: (client, collection) - MongoDB client and collection objects
+    The client is created, pinged and has its indexes ensured once, on first use.
+    MongoClient keeps its own connection pool and is thread-safe, so the same client
+    serves the event loop (through asyncio.to_thread) and synchronous code. A failed
+    connection attempt is remembered, so a run without a reachable database only
+    waits for the server selection timeout once.
     """
-    try:
-        # Check if MONGODB_URI is set
-        if not MONGODB_URI:
-            print("MongoDB URI is not set. Please set the MONGODB_URI environment variable.")
-            return None, None
-        
-        print(f"Attempting to connect to MongoDB using URI: {MONGODB_URI.split('@')[-1] if '@' in MONGODB_URI else 'localhost'}")
-        
-        # Connect to MongoDB using the URI from environment variables
-        # Set serverSelectionTimeoutMS to reduce connection timeout
-        client = pymongo.MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        
-        # Ping the server to verify connection
-        client.admin.command('ping')
-        
-        db = client[MONGODB_DATABASE]
-        collection = db[MONGODB_COLLECTION]
-        
-        # Create an index on the URL field for faster lookups
-        collection.create_index([("url", pymongo.ASCENDING)], unique=True)
+    
+    def __init__(self, uri=MONGODB_URI, database=MONGODB_DATABASE, collection=MONGODB_COLLECTION):
+        self.uri = uri
+        self.database_name = database
+        self.collection_name = collection
+        self.client = None
+        self.collection = None
+        self._attempted = False
+        self._lock = threading.Lock()
+    
+    def connect(self):
+        """
+        Return the shared client and scraped URL collection, connecting on first use.
         
-        print(f"Connected to MongoDB: {MONGODB_DATABASE}.{MONGODB_COLLECTION}")
-        return client, collection
-    except pymongo.errors.ServerSelectionTimeoutError as e:
-        print(f"MongoDB connection timed out: {str(e)}")
-        print("Please check that your MongoDB server is running and accessible.")
-        print("If using a remote MongoDB, check your network connection and firewall settings.")
-        return None, None
-    except pymongo.errors.ConfigurationError as e:
-        print(f"MongoDB configuration error: {str(e)}")
-        print("Please check your MongoDB URI format.")
-        return None, None
-    except pymongo.errors.OperationFailure as e:
-        print(f"MongoDB authentication failed: {str(e)}")
-        print("Please check your MongoDB username and password.")
-        return None, None
-    except Exception as e:
-        print(f"Error connecting to MongoDB: {str(e)}")
-        print(f"MongoDB URI being used: {MONGODB_URI.replace(MONGODB_URI.split('@')[0] if '@' in MONGODB_URI else MONGODB_URI, '***')}")
-        return None, None
+        Returns:
+            tuple: (client, collection), or (None, None) if MongoDB is not available
+        """
+        with self._lock:
+            if not self._attempted:
+                self._attempted = True
+                self.client, self.collection = self._open()
+            return self.client, self.collection
+    
+    def _open(self):
+        uri = self.uri
+        try:
+            # Check if MONGODB_URI is set
+            if not uri:
+                print("MongoDB URI is not set. Please set the MONGODB_URI environment variable.")
+                return None, None
+            
+            print(f"Attempting to connect to MongoDB using URI: {uri.split('@')[-1] if '@' in uri else 'localhost'}")
+            
+            # Connect to MongoDB using the URI from environment variables
+            # Set serverSelectionTimeoutMS to reduce connection timeout
+            client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=5000)
+            
+            # Ping the server to verify connection
+            client.admin.command('ping')
+            
+            db = client[self.database_name]
+            collection = db[self.collection_name]
+            
+            # Create an index on the URL field for faster lookups
+            collection.create_index([("url", pymongo.ASCENDING)], unique=True)
+            # And on the scrape time for incremental syncs of the local seen-URL snapshot
+            collection.create_index([("scraped_at", pymongo.ASCENDING)])
+            
+            print(f"Connected to MongoDB: {self.database_name}.{self.collection_name}")
+            return client, collection
+        except pymongo.errors.ServerSelectionTimeoutError as e:
+            print(f"MongoDB connection timed out: {str(e)}")
+            print("Please check that your MongoDB server is running and accessible.")
+            print("If using a remote MongoDB, check your network connection and firewall settings.")
+            return None, None
+        except pymongo.errors.ConfigurationError as e:
+            print(f"MongoDB configuration error: {str(e)}")
+            print("Please check your MongoDB URI format.")
+            return None, None
+        except pymongo.errors.OperationFailure as e:
+            print(f"MongoDB authentication failed: {str(e)}")
+            print("Please check your MongoDB username and password.")
+            return None, None
+        except Exception as e:
+            print(f"Error connecting to MongoDB: {str(e)}")
+            print(f"MongoDB URI being used: {uri.replace(uri.split('@')[0] if '@' in uri else uri, '***')}")
+            return None, None
+    
+    async def connect_async(self):
+        """Async version of connect()."""
+        return await asyncio.to_thread(self.connect)
+    
+    def close(self):
+        """Close the shared client; the next connect() opens a new one."""
+        with self._lock:
+            if self.client is not None:
+                self.client.close()
+                print("MongoDB connection closed")
+            self.client = None
+            self.collection = None
+            self._attempted = False
 
-def save_scraped_url(collection, url):
+# Shared connection used by the whole process, closed at interpreter exit
+mongo_manager = MongoConnectionManager()
+atexit.register(mongo_manager.close)
+
+def get_all_scraped_urls(collection):
     """
-    Save a scraped URL to the MongoDB collection.
+    Get all previously scraped URLs from the database.
     
     Args:
         collection: MongoDB collection
-        url: URL to save
         
     Returns:
-        bool: True if successful, False otherwise
+        set: Set of previously scraped URLs
     """
     try:
         if collection is None:
-            print("Cannot save URL - MongoDB collection is not available")
-            return False
+            print("Cannot retrieve URLs - MongoDB collection is not available")
+            return set()
             
-        # Create document with URL and timestamp
-        document = {
-            "url": url,
-            "scraped_at": datetime.now(),
-        }
-        
-        # Insert or update the document (upsert)
-        collection.update_one(
-            {"url": url},
-            {"$set": document},
-            upsert=True
-        )
-        return True
+        cursor = collection.find({}, {"url": 1, "_id": 0})
+        return {doc["url"] for doc in cursor}
     except Exception as e:
-        print(f"Error saving URL to MongoDB: {str(e)}")
-        return False
+        print(f"Error retrieving URLs from MongoDB: {str(e)}")
+        return set() 
 
-def is_url_scraped(collection, url):
+def find_scraped_urls(collection, urls, chunk_size=SEEN_CHECK_CHUNK_SIZE):
     """
-    Check if a URL has already been scraped.
+    Find which of the given URLs have already been scraped.
+    
+    Only the candidate URLs are looked up, in chunked $in queries on the unique
+    url index. The projection only asks for the indexed field, so the queries are
+    answered from the index without reading the documents.
     
     Args:
         collection: MongoDB collection
-        url: URL to check
+        urls: Candidate URLs
+        chunk_size: Maximum number of URLs per query
         
     Returns:
-        bool: True if URL has been scraped before, False otherwise
+        set: The candidate URLs found in the collection
     """
     try:
         if collection is None:
-            print("Cannot check URL - MongoDB collection is not available")
-            return False
-            
-        result = collection.find_one({"url": url})
-        return result is not None
+            print("Cannot check URLs - MongoDB collection is not available")
+            return set()
+        
+        urls = list(dict.fromkeys(urls))
+        found = set()
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            cursor = collection.find({"url": {"$in": chunk}}, {"url": 1, "_id": 0})
+            found.update(doc["url"] for doc in cursor)
+        return found
     except Exception as e:
-        print(f"Error checking URL in MongoDB: {str(e)}")
-        return False
+        print(f"Error checking URLs in MongoDB: {str(e)}")
+        return set()
 
-def get_all_scraped_urls(collection):
+class UrlRegistry:
     """
-    Get all previously scraped URLs from the database.
+    Storage backend for the scraped URL records ({"url": ..., "scraped_at": datetime}).
     
-    Args:
-        collection: MongoDB collection
-        
-    Returns:
-        set: Set of previously scraped URLs
+    Every method connects on first use. Lookups return an empty result when the
+    store is not available, like find_scraped_urls() and get_all_scraped_urls(); save_many() raises
+    so that callers can keep unwritten records and retry.
+    
+    Attributes:
+        name: Backend name used in config (URL_REGISTRY_BACKEND)
+        label: Name used in log messages
+        transient_errors: Exceptions after which a write is worth retrying
     """
-    try:
+    
+    name = None
+    label = None
+    transient_errors = ()
+    
+    def connect(self):
+        """
+        Open the store if needed.
+        
+        Returns:
+            bool: True if the store is available
+        """
+        raise NotImplementedError
+    
+    async def connect_async(self):
+        """Async version of connect()."""
+        return await asyncio.to_thread(self.connect)
+    
+    def describe(self):
+        """Where the records are stored, for log messages."""
+        raise NotImplementedError
+    
+    def save_many(self, documents):
+        """
+        Insert or update records by URL in one batch.
+        
+        Args:
+            documents: List of {"url", "scraped_at"} dicts
+        
+        Returns:
+            set: Indexes of the documents the store rejected
+        """
+        raise NotImplementedError
+    
+    def find_scraped(self, urls, chunk_size=SEEN_CHECK_CHUNK_SIZE):
+        """Return the subset of urls that has been scraped (see find_scraped_urls)."""
+        raise NotImplementedError
+    
+    def all_urls(self):
+        """Return every scraped URL as a set."""
+        raise NotImplementedError
+    
+    def scraped_since(self, watermark=None):
+        """
+        Iterate over the records scraped at or after a time.
+        
+        Args:
+            watermark: datetime, or None for every record
+        
+        Returns:
+            iterator of {"url", "scraped_at"} dicts
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Close the store; the next call opens it again."""
+    
+    def save(self, url):
+        """Save one URL as scraped now; returns True if successful."""
+        try:
+            return not self.save_many([{"url": url, "scraped_at": datetime.now()}])
+        except Exception as e:
+            print(f"Error saving URL to {self.label}: {str(e)}")
+            return False
+    
+    def is_scraped(self, url):
+        """Check if a URL has already been scraped."""
+        return url in self.find_scraped([url])
+
+class MongoUrlRegistry(UrlRegistry):
+    """Scraped URLs in the shared MongoDB collection (see MongoConnectionManager)."""
+    
+    name = 'mongodb'
+    label = 'MongoDB'
+    # Network errors, timeouts and primary elections
+    transient_errors = (pymongo.errors.AutoReconnect,)
+    
+    def __init__(self, manager=mongo_manager):
+        self.manager = manager
+    
+    def _collection(self):
+        return self.manager.connect()[1]
+    
+    def connect(self):
+        return self._collection() is not None
+    
+    def describe(self):
+        return f"MongoDB {self.manager.database_name}.{self.manager.collection_name}"
+    
+    def save_many(self, documents):
+        collection = self._collection()
         if collection is None:
-            print("Cannot retrieve URLs - MongoDB collection is not available")
+            raise ConnectionError("MongoDB is not available")
+        requests = [UpdateOne({"url": document["url"]}, {"$set": document}, upsert=True)
+                    for document in documents]
+        try:
+            collection.bulk_write(requests, ordered=False)
+        except pymongo.errors.BulkWriteError as e:
+            # Unordered: every record without a write error was still written
+            return {error['index'] for error in e.details.get('writeErrors', [])}
+        return set()
+    
+    def find_scraped(self, urls, chunk_size=SEEN_CHECK_CHUNK_SIZE):
+        return find_scraped_urls(self._collection(), urls, chunk_size)
+    
+    def all_urls(self):
+        return get_all_scraped_urls(self._collection())
+    
+    def scraped_since(self, watermark=None):
+        collection = self._collection()
+        if collection is None:
+            return iter(())
+        query = {"scraped_at": {"$gte": watermark}} if watermark else {}
+        return collection.find(query, {"url": 1, "scraped_at": 1, "_id": 0})
+    
+    def close(self):
+        self.manager.close()
+
+class SqliteUrlRegistry(UrlRegistry):
+    """
+    Scraped URLs in a local SQLite database in WAL mode, for single-node deployments
+    and tests: no network and no server selection timeout. The url column is the
+    primary key (so lookups use its index) and batches are written in one transaction.
+    """
+    
+    name = 'sqlite'
+    label = 'SQLite'
+    # "database is locked" when another process holds the write lock too long
+    transient_errors = (sqlite3.OperationalError,)
+    
+    def __init__(self, path=URL_REGISTRY_SQLITE_PATH):
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS scraped_urls (
+                    url TEXT PRIMARY KEY,
+                    scraped_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_scraped_urls_scraped_at ON scraped_urls (scraped_at)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+    
+    def connect(self):
+        try:
+            with self._lock:
+                self._connect()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error opening SQLite URL registry {self.path}: {str(e)}")
+            return False
+    
+    def describe(self):
+        return f"SQLite {self.path}"
+    
+    def save_many(self, documents):
+        rows = [(document["url"], document["scraped_at"].timestamp()) for document in documents]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany("""
+                    INSERT INTO scraped_urls (url, scraped_at) VALUES (?, ?)
+                    ON CONFLICT(url) DO UPDATE SET scraped_at = excluded.scraped_at
+                """, rows)
+        return set()
+    
+    def find_scraped(self, urls, chunk_size=SEEN_CHECK_CHUNK_SIZE):
+        urls = list(dict.fromkeys(urls))
+        found = set()
+        # Stay below SQLite's limit on query parameters
+        chunk_size = min(chunk_size, 500)
+        try:
+            with self._lock:
+                connection = self._connect()
+                for start in range(0, len(urls), chunk_size):
+                    chunk = urls[start:start + chunk_size]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = connection.execute(f"SELECT url FROM scraped_urls WHERE url IN ({placeholders})", chunk)
+                    found.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            print(f"Error checking URLs in SQLite: {str(e)}")
             return set()
-            
-        cursor = collection.find({}, {"url": 1, "_id": 0})
-        return {doc["url"] for doc in cursor}
-    except Exception as e:
-        print(f"Error retrieving URLs from MongoDB: {str(e)}")
-        return set() 
\ No newline at end of file
+        return found
+    
+    def all_urls(self):
+        try:
+            with self._lock:
+                return {row[0] for row in self._connect().execute("SELECT url FROM scraped_urls")}
+        except sqlite3.Error as e:
+            print(f"Error retrieving URLs from SQLite: {str(e)}")
+            return set()
+    
+    def scraped_since(self, watermark=None):
+        since = watermark.timestamp() if watermark and watermark != datetime.min else float('-inf')
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT url, scraped_at FROM scraped_urls WHERE scraped_at >= ?", (since,)).fetchall()
+        return ({"url": url, "scraped_at": datetime.fromtimestamp(scraped_at)} for url, scraped_at in rows)
+    
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+URL_REGISTRIES = {
+    MongoUrlRegistry.name: MongoUrlRegistry,
+    SqliteUrlRegistry.name: SqliteUrlRegistry,
+}
+
+def get_url_registry(name=URL_REGISTRY_BACKEND, **kwargs):
+    """
+    Create a scraped URL registry by name.
+    
+    Args:
+        name: "mongodb" or "sqlite"
+        **kwargs: Passed to the registry constructor
+    
+    Returns:
+        UrlRegistry
+    """
+    if name not in URL_REGISTRIES:
+        raise ValueError(f"Unknown URL registry {name!r}, expected one of {', '.join(URL_REGISTRIES)}")
+    return URL_REGISTRIES[name](**kwargs)
+
+# Registry selected in config.py, closed at interpreter exit
+url_registry = get_url_registry()
+atexit.register(url_registry.close)
+
+class ScrapedUrlWriter:
+    """
+    Buffer of scraped URL records written to the URL registry in one batch
+    (an unordered bulk write on MongoDB, one transaction on SQLite).
+    
+    add() only queues a record. With commit_on_publish the records are held until
+    flush() is called after the PDF has been sent, which makes the Telegram send the
+    commit point of a run; otherwise the buffer is flushed as soon as it holds
+    batch_size records or its oldest record is flush_interval seconds old. Upserts
+    are idempotent, so a batch that fails with a transient error is simply sent again.
+    The documents written so far are kept in `written`.
+    """
+    
+    def __init__(self, registry=url_registry, batch_size=SCRAPED_URL_BATCH_SIZE,
+                 flush_interval=SCRAPED_URL_FLUSH_INTERVAL, commit_on_publish=SCRAPED_URL_COMMIT_ON_PUBLISH,
+                 retries=SCRAPED_URL_WRITE_RETRIES):
+        self.registry = registry
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.commit_on_publish = commit_on_publish
+        self.retries = retries
+        self._pending = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self.written = []
+        self.stats = {'queued': 0, 'written': 0, 'bulk_writes': 0, 'retries': 0, 'failed': 0, 'discarded': 0}
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    def add(self, url):
+        """
+        Queue a URL as scraped.
+        
+        Returns:
+            bool: True if the size or time threshold has been reached and the
+                  buffer should be flushed now
+        """
+        with self._lock:
+            if url not in self._pending:
+                self.stats['queued'] += 1
+            self._pending[url] = {"url": url, "scraped_at": datetime.now()}
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self.commit_on_publish:
+                return False
+            return (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._oldest >= self.flush_interval)
+    
+    def _take(self):
+        with self._lock:
+            documents = list(self._pending.values())
+            self._pending = {}
+            self._oldest = None
+            return documents
+    
+    def _restore(self, documents):
+        # Put unwritten records back without overwriting newer ones
+        with self._lock:
+            for document in documents:
+                self._pending.setdefault(document["url"], document)
+            if self._pending and self._oldest is None:
+                self._oldest = time.monotonic()
+    
+    def _write_batch(self, batch):
+        """Save one batch, retrying it after a transient error; returns the rejected indexes."""
+        for attempt in range(self.retries + 1):
+            try:
+                rejected = self.registry.save_many(batch)
+                self.stats['bulk_writes'] += 1
+                return rejected
+            except self.registry.transient_errors as e:
+                if attempt == self.retries:
+                    raise
+                self.stats['retries'] += 1
+                wait = 2 ** attempt
+                print(f"  • Bulk write of scraped URLs failed ({str(e)}), retrying in {wait}s...")
+                time.sleep(wait)
+    
+    def flush(self):
+        """
+        Write every queued record to the registry.
+        
+        Returns:
+            int: Number of records written; records that could not be written
+                 because of a connection problem stay queued
+        """
+        documents = self._take()
+        if not documents:
+            return 0
+        label = self.registry.label
+        if not self.registry.connect():
+            print(f"  ✗ {label} is not available, {len(documents)} scraped URLs not saved")
+            self._restore(documents)
+            return 0
+        
+        written = 0
+        for start in range(0, len(documents), self.batch_size):
+            batch = documents[start:start + self.batch_size]
+            try:
+                rejected = self._write_batch(batch)
+            except Exception as e:
+                print(f"  ✗ Error saving scraped URLs to {label}: {str(e)}")
+                self._restore(documents[start:])
+                break
+            if rejected:
+                self.stats['failed'] += len(rejected)
+                print(f"  ✗ {len(rejected)} scraped URLs were rejected by {label}")
+            written += len(batch) - len(rejected)
+            self.written.extend(document for index, document in enumerate(batch) if index not in rejected)
+        
+        self.stats['written'] += written
+        if written:
+            print(f"  ✓ Saved {written} scraped URLs to {label}")
+        return written
+    
+    async def add_async(self, url):
+        """Queue a URL and flush in a worker thread if a threshold has been reached."""
+        if self.add(url):
+            await asyncio.to_thread(self.flush)
+    
+    async def flush_async(self):
+        """Async version of flush()."""
+        return await asyncio.to_thread(self.flush)
+    
+    def close(self):
+        """
+        End of run: flush what is left, unless records are only committed on publish,
+        in which case the unpublished URLs are dropped so they are scraped again.
+        """
+        if self.commit_on_publish:
+            documents = self._take()
+            if documents:
+                self.stats['discarded'] += len(documents)
+                print(f"{len(documents)} scraped URLs were not published and will be scraped again next run")
+            return
+        self.flush()
+    
+    def report(self):
+        """Print how the scraped URL records were written in this run."""
+        if not self.stats['queued']:
+            return
+        print("Scraped URL writer statistics:")
+        print(f"  • Queued: {self.stats['queued']}, written: {self.stats['written']} "
+              f"in {self.stats['bulk_writes']} bulk writes (retries: {self.stats['retries']})")
+        print(f"  • Rejected: {self.stats['failed']}, not published: {self.stats['discarded']}")
+
+# Shared buffer for the URLs scraped in this run
+scraped_url_writer = ScrapedUrlWriter()
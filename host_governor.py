@@ -0,0 +1,190 @@
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from config import HOST_LIMITS, DEFAULT_HOST_LIMITS
+
+# Status codes that mean "slow down"
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+
+# How long a waiting request sleeps before checking the window again
+POLL_INTERVAL = 0.05
+
+class HostGovernor:
+    """
+    Rate and concurrency limiter for one destination host.
+
+    Requests need a token from a token bucket (refilled at `rate` per second, up to
+    `burst`) and a free slot in a concurrency window. The window grows by one request
+    per window's worth of fast, successful responses (additive increase) and is halved
+    on a 429/5xx response or a network error and reduced by 10% when a response is
+    slower than target_latency (multiplicative decrease). A Retry-After header, or an
+    exponential backoff after consecutive errors, pauses the whole host.
+    """
+
+    def __init__(self, host, rate, burst, max_window, target_latency, min_window=1):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_window = min_window
+        self.max_window = max_window
+        self.target_latency = target_latency
+        self.window = float(min(max_window, max(min_window, max_window // 2)))
+        self.tokens = float(burst)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.consecutive_errors = 0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'slow': 0,
+                      'retry_after_waits': 0, 'total_latency': 0.0, 'min_window': self.window}
+
+    def _try_acquire(self):
+        """
+        Take a token and a window slot if both are available.
+
+        Returns:
+            float: 0 if acquired, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.in_flight >= int(self.window):
+                return POLL_INTERVAL
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            self.tokens -= 1
+            self.in_flight += 1
+            self.stats['requests'] += 1
+            return 0
+
+    def _release(self, latency, status=None, retry_after=None, error=False, cancelled=False):
+        """Free the window slot and adjust the window from the outcome of the request."""
+        with self._lock:
+            self.in_flight -= 1
+            if cancelled:
+                # The caller gave up (e.g. article timeout); says nothing about the host
+                return
+            self.stats['total_latency'] += latency
+            throttled = status in THROTTLE_STATUSES
+
+            if throttled or error:
+                self.stats['throttled' if throttled else 'errors'] += 1
+                self.consecutive_errors += 1
+                self.window = max(self.min_window, self.window / 2)
+                pause = retry_after if retry_after is not None else min(30, 2 ** self.consecutive_errors)
+                if retry_after is not None:
+                    self.stats['retry_after_waits'] += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            elif latency > self.target_latency:
+                self.stats['slow'] += 1
+                self.consecutive_errors = 0
+                self.window = max(self.min_window, self.window * 0.9)
+            else:
+                self.consecutive_errors = 0
+                self.window = min(self.max_window, self.window + 1 / self.window)
+            self.stats['min_window'] = min(self.stats['min_window'], self.window)
+
+    @asynccontextmanager
+    async def request(self):
+        """
+        Wait for permission to send a request from the event loop.
+
+        Yields a dict the caller fills in with 'status' and 'retry_after' (seconds)
+        once the response arrives; an exception raised inside the block counts as
+        an error unless a throttling status was recorded.
+        """
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+
+        outcome = {'status': None, 'retry_after': None}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            self._release(time.monotonic() - start, outcome['status'], outcome['retry_after'],
+                          error=outcome['status'] is None)
+            raise
+        except BaseException:
+            self._release(time.monotonic() - start, cancelled=True)
+            raise
+        self._release(time.monotonic() - start, outcome['status'], outcome['retry_after'])
+
+    def metrics(self):
+        """Return the current window and throttle counters."""
+        with self._lock:
+            requests = self.stats['requests']
+            return {
+                'host': self.host,
+                'window': round(self.window, 2),
+                'min_window': round(self.stats['min_window'], 2),
+                'in_flight': self.in_flight,
+                'requests': requests,
+                'throttled': self.stats['throttled'],
+                'errors': self.stats['errors'],
+                'slow': self.stats['slow'],
+                'retry_after_waits': self.stats['retry_after_waits'],
+                'avg_latency': self.stats['total_latency'] / requests if requests else 0.0,
+            }
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+def get_governor(url_or_host, limits=None):
+    """
+    Return the shared governor for the host of a URL (created on first use).
+
+    Args:
+        url_or_host: Full URL or bare host name
+        limits: Default limits for the host if it has none in HOST_LIMITS
+
+    Returns:
+        HostGovernor
+    """
+    host = urlparse(url_or_host).hostname if '://' in url_or_host else url_or_host
+    host = host or url_or_host
+    with _governors_lock:
+        if host not in _governors:
+            host_limits = dict(DEFAULT_HOST_LIMITS, **(limits or {}))
+            host_limits.update(HOST_LIMITS.get(host, {}))
+            _governors[host] = HostGovernor(host, **host_limits)
+        return _governors[host]
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def governor_report():
+    """Print the window and throttle metrics of every host used in this run."""
+    if not _governors:
+        return
+    print("Host governor statistics:")
+    for governor in list(_governors.values()):
+        m = governor.metrics()
+        print(f"  • {m['host']}: {m['requests']} requests, window {m['window']} (lowest {m['min_window']}), "
+              f"throttled {m['throttled']}, errors {m['errors']}, slow {m['slow']}, "
+              f"Retry-After pauses {m['retry_after_waits']}, avg latency {m['avg_latency']:.2f}s")
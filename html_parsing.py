@@ -0,0 +1,62 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from config import HTML_PARSER, HTML_SCOPED_PARSING
+
+# BeautifulSoup tree builders we know how to use, fastest first
+PARSER_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+# Elements to materialise for each kind of page when scoped parsing is enabled.
+# Everything outside these elements (navigation, sidebars, widgets, scripts) is
+# skipped by the parser instead of being built and thrown away.
+PARSE_SCOPES = {
+    # Listing containers that hold the article links
+    'listing': SoupStrainer('div', class_=['post-data', 'home-post-item']),
+    # Main article element (current and old layout) and the old featured image block
+    'article': SoupStrainer(['main', 'div'], class_=['site-main', 'inside_post', 'featured_image']),
+}
+
+_resolved_backends = {}
+
+def get_parser_backend(name=None):
+    """
+    Resolve the configured parser backend to one that is installed.
+    
+    Args:
+        name: Backend name ("lxml", "html.parser" or "html5lib"), defaults to HTML_PARSER
+    
+    Returns:
+        str: Name of a usable BeautifulSoup tree builder
+    """
+    name = name or HTML_PARSER
+    if name in _resolved_backends:
+        return _resolved_backends[name]
+    
+    backend = name
+    if name not in PARSER_BACKENDS:
+        print(f"Unknown HTML parser '{name}', using html.parser")
+        backend = 'html.parser'
+    elif name != 'html.parser':
+        try:
+            __import__(name)
+        except ImportError:
+            print(f"HTML parser '{name}' is not installed, using html.parser")
+            backend = 'html.parser'
+    
+    _resolved_backends[name] = backend
+    return backend
+
+def parse_html(content, scope=None, parser=None):
+    """
+    Parse an HTML page with the configured backend.
+    
+    Args:
+        content: Raw HTML (bytes or str)
+        scope: Optional key of PARSE_SCOPES; only those elements are materialised
+        parser: Optional backend name overriding HTML_PARSER
+    
+    Returns:
+        BeautifulSoup: Parsed tree (only the scoped elements when scope is given)
+    """
+    backend = get_parser_backend(parser)
+    if scope and HTML_SCOPED_PARSING:
+        return BeautifulSoup(content, backend, parse_only=PARSE_SCOPES[scope])
+    return BeautifulSoup(content, backend)
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import hashlib
+import aiohttp
+from email.utils import parsedate_to_datetime
+from host_governor import get_governor, parse_retry_after
+from config import HTTP_CACHE_ENABLED, HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+
+class HttpCache:
+    """
+    Disk-backed HTTP cache with conditional-GET revalidation and size-bounded LRU eviction.
+    
+    Each URL is stored as two files named after the SHA-256 of the URL: a ".body" file with
+    the raw response body and a ".json" file with the validators (ETag, Last-Modified),
+    freshness information from Cache-Control/Expires and the last access time.
+    """
+    
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES, enabled=HTTP_CACHE_ENABLED):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0, 'bytes_saved': 0}
+        # Running estimate of the bytes on disk; the exact size is recomputed when eviction runs
+        self._total_bytes = None
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+    
+    def lookup(self, url):
+        """
+        Look up a cached response.
+        
+        Args:
+            url: URL of the resource
+        
+        Returns:
+            dict: Cache entry metadata with the body under 'body', or None if not cached
+        """
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def is_fresh(self, entry):
+        """Check whether a cached entry can be used without revalidating it."""
+        if entry.get('no_cache'):
+            return False
+        expires_at = entry.get('expires_at')
+        return expires_at is not None and time.time() < expires_at
+    
+    def conditional_headers(self, entry):
+        """Build If-None-Match / If-Modified-Since headers for revalidating an entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def _freshness(self, headers):
+        """
+        Work out caching rules from response headers.
+        
+        Returns:
+            tuple: (storable, no_cache, expires_at)
+        """
+        cache_control = {}
+        for directive in headers.get('Cache-Control', '').split(','):
+            name, _, value = directive.strip().partition('=')
+            if name:
+                cache_control[name.lower()] = value.strip('"')
+        
+        if 'no-store' in cache_control:
+            return False, True, None
+        
+        no_cache = 'no-cache' in cache_control
+        expires_at = None
+        if 'max-age' in cache_control:
+            try:
+                expires_at = time.time() + int(cache_control['max-age'])
+            except ValueError:
+                expires_at = None
+        elif headers.get('Expires'):
+            try:
+                expires_at = parsedate_to_datetime(headers['Expires']).timestamp()
+            except (TypeError, ValueError):
+                expires_at = None
+        
+        return True, no_cache, expires_at
+    
+    def _write_meta(self, url, entry):
+        meta_path, _ = self._paths(url)
+        meta = {key: value for key, value in entry.items() if key != 'body'}
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    
+    def store(self, url, headers, body):
+        """
+        Store a 200 response in the cache.
+        
+        Args:
+            url: URL of the resource
+            headers: Response headers (mapping)
+            body: Response body as bytes
+        """
+        if not self.enabled:
+            return
+        storable, no_cache, expires_at = self._freshness(headers)
+        if not storable:
+            return
+        try:
+            meta_path, body_path = self._paths(url)
+            tmp_path = f"{body_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, body_path)
+            self._write_meta(url, {
+                'url': url,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'no_cache': no_cache,
+                'expires_at': expires_at,
+                'size': len(body),
+                'stored_at': time.time(),
+                'last_access': time.time(),
+            })
+            self.stats['stored'] += 1
+            if self._total_bytes is None:
+                self._total_bytes = sum(item.stat().st_size for item in os.scandir(self.cache_dir)
+                                        if item.name.endswith('.body'))
+            else:
+                self._total_bytes += len(body)
+            if self._total_bytes > self.max_bytes:
+                self.evict()
+        except OSError as e:
+            print(f"  ✗ Could not write HTTP cache entry for {url}: {str(e)}")
+    
+    def refresh(self, url, entry, headers):
+        """Update a cached entry after the server answered 304 Not Modified."""
+        _, no_cache, expires_at = self._freshness(headers)
+        entry['no_cache'] = no_cache
+        entry['expires_at'] = expires_at
+        entry['etag'] = headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        self.touch(url, entry)
+    
+    def touch(self, url, entry):
+        """Record an access to an entry for LRU eviction."""
+        entry['last_access'] = time.time()
+        try:
+            self._write_meta(url, entry)
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append((meta.get('last_access', 0), meta_path, meta.get('size', 0)))
+            total += meta.get('size', 0)
+        
+        for _, meta_path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, meta_path[:-len('.json')] + '.body'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            self.stats['evicted'] += 1
+        self._total_bytes = total
+    
+    def report(self):
+        """Print the hit/miss/revalidation counters for this run."""
+        print("HTTP cache statistics:")
+        print(f"  • Fresh hits: {self.stats['hits']}")
+        print(f"  • Revalidated (304): {self.stats['revalidated']}")
+        print(f"  • Misses: {self.stats['misses']}")
+        print(f"  • Stored: {self.stats['stored']}, evicted: {self.stats['evicted']}")
+        print(f"  • Bytes not downloaded: {self.stats['bytes_saved']}")
+
+# Shared cache used by all scraper fetches in this process
+http_cache = HttpCache()
+
+async def cached_fetch(session, url, timeout=None, cache=None):
+    """
+    Fetch a URL with an aiohttp session through the HTTP cache.
+    
+    Args:
+        session: aiohttp.ClientSession to use
+        url: URL to fetch
+        timeout: Optional request timeout in seconds (defaults to the session timeout)
+        cache: HttpCache to use (defaults to the shared cache)
+    
+    Returns:
+        bytes: Response body
+    """
+    cache = cache or http_cache
+    entry = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        cache.stats['hits'] += 1
+        cache.stats['bytes_saved'] += len(entry['body'])
+        cache.touch(url, entry)
+        return entry['body']
+    
+    request_kwargs = {'headers': cache.conditional_headers(entry)}
+    if timeout:
+        request_kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+    
+    # Only requests that actually go to the network are governed
+    async with get_governor(url).request() as outcome:
+        async with session.get(url, **request_kwargs) as response:
+            outcome['status'] = response.status
+            outcome['retry_after'] = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status == 304 and entry:
+                cache.stats['revalidated'] += 1
+                cache.stats['bytes_saved'] += len(entry['body'])
+                cache.refresh(url, entry, response.headers)
+                return entry['body']
+            
+            response.raise_for_status()
+            body = await response.read()
+    
+    cache.stats['misses'] += 1
+    cache.store(url, response.headers, body)
+    return body
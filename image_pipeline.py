@@ -0,0 +1,115 @@
+import io
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+# CSS pixels per inch, used to convert the template's box size to device pixels
+CSS_DPI = 96
+
+_pool = None
+
+def get_image_pool(workers):
+    """
+    Return the shared process pool used for image decoding and encoding.
+
+    Args:
+        workers: Number of worker processes (only used when the pool is created)
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    global _pool
+    if _pool is None:
+        # The scraper process runs threads (asyncio.to_thread, cache flushers), so the
+        # workers are not forked from it; forkserver is not available on Windows
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+    return _pool
+
+def shutdown_image_pool():
+    """Stop the image worker processes."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+def is_photo(img):
+    """
+    Decide whether an image is a photo (JPEG-friendly) or a flat graphic (PNG-friendly).
+    Palette images and images with few distinct colours are treated as graphics.
+    """
+    if img.mode in ('P', '1', 'L') and img.format != 'JPEG':
+        return False
+    if img.format == 'JPEG':
+        return True
+    # getcolors() returns None when there are more colours than maxcolors
+    sample = img.copy()
+    sample.thumbnail((128, 128))
+    return sample.convert('RGB').getcolors(maxcolors=256) is None
+
+def convert_image(content, box_width, max_height, dpi, quality):
+    """
+    Decode, crop and resize an image for the space it gets in the PDF, then encode it.
+
+    The template shows images at the full content width with a capped height and
+    object-fit: cover, so anything outside that box is never visible. The image is
+    cropped to the visible box, scaled to the target DPI and encoded as JPEG for
+    photos or PNG for flat graphics.
+
+    Args:
+        content: Raw image bytes
+        box_width: Rendered width in CSS pixels
+        max_height: Maximum rendered height in CSS pixels
+        dpi: Target resolution in the PDF
+        quality: JPEG quality for photos
+
+    Returns:
+        tuple: (encoded bytes, MIME type)
+    """
+    img = Image.open(io.BytesIO(content))
+    target_width = round(box_width * dpi / CSS_DPI)
+    target_max_height = round(max_height * dpi / CSS_DPI)
+
+    # Let the JPEG decoder skip detail we are going to throw away anyway
+    # (decodes at 1/2, 1/4 or 1/8 scale while staying above the target size)
+    if img.format == 'JPEG':
+        width, height = img.size
+        scale = target_width / width
+        img.draft('RGB', (max(1, round(width * scale)), max(1, round(height * scale))))
+
+    photo = is_photo(img)
+
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        # Flatten transparency onto a white background
+        rgba = img.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Crop to the visible part of the box (object-fit: cover keeps the centre)
+    width, height = img.size
+    rendered_height = height * box_width / width
+    if rendered_height > max_height:
+        visible_height = round(width * max_height / box_width)
+        top = (height - visible_height) // 2
+        img = img.crop((0, top, width, top + visible_height))
+
+    # Never upscale; only shrink images larger than the rendered box
+    width, height = img.size
+    if width > target_width:
+        new_height = max(1, round(height * target_width / width))
+        img = img.resize((target_width, min(new_height, target_max_height)), Image.LANCZOS)
+
+    output = io.BytesIO()
+    if photo:
+        img.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+        return output.getvalue(), 'image/jpeg'
+    img.save(output, format='PNG', optimize=True)
+    return output.getvalue(), 'image/png'
+
+def to_data_uri(data, mime_type):
+    """Encode image bytes as a data URI for embedding in HTML."""
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
@@ -0,0 +1,169 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+from remote_cache import remote_cache
+from config import IMAGE_STORE_ENABLED, IMAGE_STORE_DIR, IMAGE_STORE_MAX_BYTES, REMOTE_CACHE_PREFETCH
+
+# File extension for each encoded image type
+EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png'}
+
+class ImageStore:
+    """
+    Content-addressed store of processed article images.
+
+    Each image is saved once as <key>.jpg or <key>.png, where the key is the SHA-256
+    of the downloaded bytes plus the resize settings, and articles reference it by
+    file URL. An image that was already processed in an earlier run (or appears in
+    several articles) is neither decoded nor written again. Least recently used
+    files are removed by prune() when the store grows beyond max_bytes. Images
+    missing locally are looked up in the MongoDB cache tier (remote_cache, GridFS).
+    """
+
+    def __init__(self, store_dir=IMAGE_STORE_DIR, max_bytes=IMAGE_STORE_MAX_BYTES, enabled=IMAGE_STORE_ENABLED,
+                 remote=remote_cache):
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.remote = remote
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stored': 0, 'evicted': 0, 'remote_hits': 0}
+        if self.enabled:
+            os.makedirs(self.store_dir, exist_ok=True)
+
+    def key(self, content, settings):
+        """
+        Build the store key for downloaded image bytes.
+
+        Args:
+            content: Raw image bytes as downloaded
+            settings: Tuple of the conversion settings (a change creates new files)
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256(content)
+        digest.update(repr(settings).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key, mime_type):
+        return os.path.join(self.store_dir, f"{key}{EXTENSIONS[mime_type]}")
+
+    def lookup(self, key):
+        """
+        Find an already processed image.
+
+        Args:
+            key: Store key from key()
+
+        Returns:
+            str: file:// URL of the image, or None if it is not stored
+        """
+        if not self.enabled:
+            return None
+        for mime_type in EXTENSIONS:
+            path = self._path(key, mime_type)
+            if os.path.exists(path):
+                try:
+                    os.utime(path)  # Mark as recently used for eviction
+                except OSError:
+                    pass
+                self.stats['hits'] += 1
+                return Path(path).resolve().as_uri()
+
+        blob = self.remote.get_blob('image', key)
+        if blob is None:
+            return None
+        data, metadata = blob
+        self.stats['hits'] += 1
+        self.stats['remote_hits'] += 1
+        return self._write(key, data, metadata['mime_type'])
+
+    def _exists(self, key):
+        return any(os.path.exists(self._path(key, mime_type)) for mime_type in EXTENSIONS)
+
+    def _write(self, key, data, mime_type):
+        """Write an image file unless it exists; returns its file:// URL."""
+        path = self._path(key, mime_type)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return Path(path).resolve().as_uri()
+
+    def put(self, key, data, mime_type):
+        """
+        Save a processed image.
+
+        Args:
+            key: Store key from key()
+            data: Encoded image bytes
+            mime_type: "image/jpeg" or "image/png"
+
+        Returns:
+            str: file:// URL of the stored image
+        """
+        uri = self._write(key, data, mime_type)
+        with self._lock:
+            self.stats['stored'] += 1
+        self.remote.put_blob('image', key, data, {'mime_type': mime_type})
+        return uri
+
+    def prefetch(self, limit=REMOTE_CACHE_PREFETCH['image']):
+        """Copy the most recently stored images of the MongoDB cache tier to disk."""
+        if not self.enabled:
+            return 0
+        copied = 0
+        for key, data, metadata in self.remote.prefetch_blobs('image', limit, skip=self._exists):
+            try:
+                self._write(key, data, metadata['mime_type'])
+                copied += 1
+            except OSError:
+                pass
+        return copied
+
+    def contains(self, image):
+        """Check that an article's image reference is still usable (data URIs always are)."""
+        if not image or not image.startswith('file:'):
+            return True
+        return os.path.exists(path_from_uri(image))
+
+    def prune(self):
+        """Remove least recently used images until the store fits in max_bytes."""
+        if not self.enabled:
+            return 0
+        entries = []
+        total = 0
+        for item in os.scandir(self.store_dir):
+            if item.name.endswith(tuple(EXTENSIONS.values())):
+                stat = item.stat()
+                entries.append((stat.st_mtime, item.path, stat.st_size))
+                total += stat.st_size
+
+        removed = 0
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        self.stats['evicted'] += removed
+        return removed
+
+    def report(self):
+        """Print the store counters for this run."""
+        print("Image store statistics:")
+        print(f"  • Reused (not decoded again): {self.stats['hits']} ({self.stats['remote_hits']} from the MongoDB cache tier)")
+        print(f"  • Stored: {self.stats['stored']}, evicted: {self.stats['evicted']}")
+
+def path_from_uri(uri):
+    """Convert a file:// URL from the store back to a filesystem path."""
+    return unquote(urlparse(uri).path)
+
+# Shared store used by the whole run
+image_store = ImageStore()
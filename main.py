@@ -1,13 +1,26 @@
+import argparse
 import asyncio
 import os
 from datetime import datetime
-from config import BASE_URL, PAGE_COUNT, PDF_OUTPUT_DIR, TEMPLATE_DIR, MONGODB_DATABASE, MONGODB_COLLECTION
-from scraper import fetch_article_urls, get_all_articles
+from config import BASE_URL, PDF_OUTPUT_DIR, TEMPLATE_DIR, MONGODB_DATABASE, MONGODB_COLLECTION, CRAWL_MODES, CRAWL_MODE
+from scraper import fetch_article_urls, get_all_articles, default_page_count, clear_backfill_checkpoint
 from pdf_generator import create_modern_pdf
 from telegram_sender import send_pdf_to_telegram
 from qr_generator import generate_qr_code
 from logo_generator import generate_logo
-from db_utils import get_mongodb_connection
+from db_utils import url_registry, scraped_url_writer
+from seen_set import seen_urls
+from http_cache import http_cache
+from archive import raw_archive
+from article_cache import article_cache
+from image_pipeline import shutdown_image_pool
+from image_store import image_store
+from host_governor import governor_report
+from translation_memory import translation_memory
+from translation import translation_service
+from translation_planner import planner_report
+from remote_cache import remote_cache
+from work_queue import run_queue_worker, assemble_from_queue
 
 def extract_topics_from_articles(articles, max_topics=5):
     """
@@ -35,24 +48,70 @@ def extract_topics_from_articles(articles, max_topics=5):
     
     return topics
 
-async def main():
-    """Main function to run the PDF generation and Telegram sending process."""
+async def main(mode=CRAWL_MODE, pages=None, replay_date=None, queue_role=None, batch=None):
+    """
+    Main function to run the PDF generation and Telegram sending process.
+    
+    Args:
+        mode: Crawl mode ("full", "incremental" or "backfill")
+        pages: Optional maximum number of listing pages to scan
+        replay_date: Optional YYYY-MM-DD; rebuild that day's edition from the raw
+                     archive without any network access and without sending it
+        queue_role: Optional "work" (only process jobs of the MongoDB work queue) or
+                    "assemble" (crawl, queue the articles, process them together with
+                    the other workers, then render and send the edition)
+        batch: Work queue batch shared by the assembler and its workers
+    """
     try:
         print("Starting Current Affairs PDF generation...")
         
-        # Check MongoDB connection
-        client, collection = get_mongodb_connection()
-        if client is None or collection is None:
-            print(f"Warning: MongoDB connection failed. Make sure MONGODB_URI is set in .env file and points to a valid MongoDB instance.")
-            print(f"MongoDB database: {MONGODB_DATABASE}, collection: {MONGODB_COLLECTION}")
-            print("Proceeding without URL tracking.")
+        if replay_date:
+            # Replay every archived listing page; the archive decides which articles were new
+            raw_archive.start_replay(replay_date)
+            # A replay must not touch the network, including the MongoDB cache tier
+            remote_cache.enabled = False
+            mode = 'full'
+            pages = len(raw_archive.urls(kind='listing')) or 1
         else:
-            print(f"MongoDB connection successful. Using database: {MONGODB_DATABASE}, collection: {MONGODB_COLLECTION}")
-            client.close()
+            # Check the scraped URL registry (MongoDB unless URL_REGISTRY_BACKEND says otherwise)
+            # Opens the shared connection used for the rest of the run
+            if not await url_registry.connect_async():
+                if url_registry.name == 'mongodb':
+                    print(f"Warning: MongoDB connection failed. Make sure MONGODB_URI is set in .env file and points to a valid MongoDB instance.")
+                    print(f"MongoDB database: {MONGODB_DATABASE}, collection: {MONGODB_COLLECTION}")
+                else:
+                    print(f"Warning: could not open the scraped URL registry ({url_registry.describe()}).")
+                print("Proceeding without URL tracking.")
+            else:
+                print(f"{url_registry.label} connection successful. Using {url_registry.describe()}")
+        
+        removed = article_cache.prune()
+        if removed:
+            print(f"Removed {removed} expired entries from the article cache")
+        removed = translation_memory.prune()
+        if removed:
+            print(f"Removed {removed} least recently used entries from the translation memory")
+        removed = image_store.prune()
+        if removed:
+            print(f"Removed {removed} least recently used images from the image store")
+        
+        # Warm the local caches from the MongoDB cache tier (a CI machine starts with empty disks)
+        if remote_cache.enabled:
+            print("Prefetching from the MongoDB cache tier...")
+            translations, articles, images = await asyncio.gather(
+                asyncio.to_thread(translation_memory.prefetch),
+                asyncio.to_thread(article_cache.prefetch),
+                asyncio.to_thread(image_store.prefetch))
+            print(f"  ✓ Copied {translations} translations, {articles} articles and {images} images to the local caches")
+        
+        if queue_role == 'work':
+            await run_queue_worker(batch)
+            return
         
         # Fetch article URLs with the improved workflow
-        print(f"Fetching and comparing article URLs from {BASE_URL} (up to {PAGE_COUNT} pages)...")
-        urls = fetch_article_urls(BASE_URL, PAGE_COUNT)
+        pages = pages or default_page_count(mode)
+        print(f"Fetching and comparing article URLs from {BASE_URL} ({mode} crawl, up to {pages} pages)...")
+        urls = await fetch_article_urls(BASE_URL, pages, mode=mode)
         
         if not urls:
             print("No URLs found to process.")
@@ -60,8 +119,11 @@ async def main():
         
         print(f"Found {len(urls)} URLs to process.")
         
-        # Scrape articles
-        articles, titles = await get_all_articles(urls)
+        # Scrape articles, on this machine only or shared with the work queue's workers
+        if queue_role == 'assemble':
+            articles, titles = await assemble_from_queue(batch, urls)
+        else:
+            articles, titles = await get_all_articles(urls)
         
         if not articles:
             print("No articles scraped successfully.")
@@ -70,11 +132,15 @@ async def main():
         print(f"Successfully scraped {len(articles)} articles.")
         
         # Generate PDF filename with date
-        date_str = datetime.now().strftime('%d-%m-%Y')
-        output_filename = f"{date_str}_Current_Affairs"
+        if replay_date:
+            date_str = datetime.strptime(replay_date, '%Y-%m-%d').strftime('%d-%m-%Y')
+            output_filename = f"{date_str}_Current_Affairs_replay"
+        else:
+            date_str = datetime.now().strftime('%d-%m-%Y')
+            output_filename = f"{date_str}_Current_Affairs"
         
         # Create PDF
-        file_path = create_modern_pdf(articles, titles, output_filename)
+        file_path = create_modern_pdf(articles, titles, output_filename, offline=bool(replay_date))
         
         if not file_path:
             print("Failed to generate PDF.")
@@ -104,6 +170,10 @@ async def main():
             except Exception as e:
                 print(f"Error verifying PDF file: {str(e)}")
         
+        if replay_date:
+            print(f"Replay complete, not sending to Telegram: {pdf_path}")
+            return
+        
         print(f"File to be sent: {pdf_path}")
         
         # Send to Telegram
@@ -111,11 +181,62 @@ async def main():
         
         if success:
             print("PDF sent to Telegram successfully.")
+            # The edition is published, so its articles can now be recorded as scraped
+            await scraped_url_writer.flush_async()
+            # Also record them locally so they are known even if the registry is down next time
+            for document in scraped_url_writer.written:
+                seen_urls.add(document["url"], document["scraped_at"])
+            seen_urls.save()
+            if mode == 'backfill':
+                clear_backfill_checkpoint()
         else:
             print("Failed to send PDF to Telegram.")
             
     except Exception as e:
         print(f"Error in main process: {str(e)}")
+    finally:
+        await translation_service.close()
+        shutdown_image_pool()
+        scraped_url_writer.close()
+        await asyncio.to_thread(remote_cache.close)
+        url_registry.close()
+        scraped_url_writer.report()
+        seen_urls.report()
+        http_cache.report()
+        article_cache.report()
+        image_store.report()
+        remote_cache.report()
+        translation_memory.report()
+        planner_report()
+        translation_memory.close()
+        governor_report()
+        raw_archive.save()
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Generate the Current Affairs PDF and send it to Telegram")
+    parser.add_argument('--mode', choices=CRAWL_MODES, default=CRAWL_MODE,
+                        help=f"Listing crawl mode (default: {CRAWL_MODE})")
+    parser.add_argument('--pages', type=int, default=None,
+                        help="Maximum number of listing pages to scan (default depends on the mode)")
+    parser.add_argument('--backfill', type=int, nargs='?', const=0, default=None, metavar='PAGES',
+                        help="Shortcut for --mode backfill, optionally with the number of pages")
+    parser.add_argument('--replay', metavar='YYYY-MM-DD', default=None,
+                        help="Rebuild a past edition from the raw archive with no network access")
+    parser.add_argument('--queue', choices=('assemble', 'work'), default=None,
+                        help="Share the articles with other machines through the MongoDB work queue")
+    parser.add_argument('--batch', default=None,
+                        help="Work queue batch shared by the assembler and its workers (default: today's date)")
+    args = parser.parse_args()
+    if args.queue and args.replay:
+        parser.error("--queue cannot be combined with --replay")
+    args.batch = args.batch or datetime.now().strftime('%Y-%m-%d')
+    if args.backfill is not None:
+        args.mode = 'backfill'
+        args.pages = args.backfill or args.pages
+    return args
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(main(mode=args.mode, pages=args.pages, replay_date=args.replay,
+                     queue_role=args.queue, batch=args.batch)) 
\ No newline at end of file
@@ -7,7 +7,25 @@ import shutil
 import re
 from logo_generator import get_text_watermark
 
-def create_modern_pdf(articles, titles, output_filename=None):
+def get_offline_url_fetcher():
+    """
+    Build a WeasyPrint URL fetcher that only loads local files and data URIs,
+    so remote fonts and stylesheets are skipped instead of downloaded.
+    """
+    try:
+        # WeasyPrint 63+
+        from weasyprint.urls import URLFetcher
+        return URLFetcher(allowed_protocols=('file', 'data'))
+    except ImportError:
+        from weasyprint import default_url_fetcher
+        
+        def offline_url_fetcher(url, *args, **kwargs):
+            if url.startswith(('http://', 'https://')):
+                raise ValueError(f"Network access disabled: {url}")
+            return default_url_fetcher(url, *args, **kwargs)
+        return offline_url_fetcher
+
+def create_modern_pdf(articles, titles, output_filename=None, offline=False):
     """
     Generate a modern PDF from the given articles using Jinja2 templates and WeasyPrint.
     Falls back to HTML export if WeasyPrint is not available.
@@ -16,6 +34,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
         articles: List of article dictionaries with content
         titles: List of article titles for the cover page
         output_filename: Optional filename for the PDF
+        offline: If True, WeasyPrint does not fetch any remote resources
     
     Returns:
         Path to the generated PDF or HTML file
@@ -83,15 +102,8 @@ def create_modern_pdf(articles, titles, output_filename=None):
         
         processed_articles.append(processed_article)
     
-    # Estimate total pages for pagination
-    # A rough estimate based on content size
-    total_pages = estimate_total_pages(processed_articles)
-    
-    # Add 1 extra page if we need a continuation page for many articles
-    if len(titles) > 14:
-        total_pages += 1
-    
     # Prepare context data for the template with absolute paths
+    # (the page total is filled in at layout time by CSS counter(pages))
     current_date = datetime.now().strftime('%d %B %Y')
     context = {
         'date': current_date,
@@ -99,8 +111,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
         'articles': processed_articles,
         'titles': titles,
         'qr_path': os.path.abspath(qr_dst).replace('\\', '/'),
-        'watermark_text': get_text_watermark(),
-        'total_pages': total_pages
+        'watermark_text': get_text_watermark()
     }
     
     # Render HTML
@@ -177,6 +188,9 @@ def create_modern_pdf(articles, titles, output_filename=None):
         # Configure fonts
         font_config = FontConfiguration()
         
+        # Only local resources when rendering offline (e.g. replaying an archived run)
+        fetcher_kwargs = {'url_fetcher': get_offline_url_fetcher()} if offline else {}
+        
         # Get CSS files with absolute paths
         css_files = [
             os.path.join(css_output_dir, 'base.css'),
@@ -190,7 +204,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
             css_files.append(fa_dst)
         
         # Load CSS files
-        css_list = [CSS(filename, font_config=font_config) for filename in css_files if os.path.exists(filename)]
+        css_list = [CSS(filename, font_config=font_config, **fetcher_kwargs) for filename in css_files if os.path.exists(filename)]
         
         # Add Google Fonts CSS for Gujarati text
         gujarati_fonts_css = CSS(string="""
@@ -199,7 +213,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
             .gujarati-text, .gujarati-title, .gujarati-heading {
                 font-family: 'Noto Serif Gujarati', 'Hind Vadodara', serif;
             }
-        """, font_config=font_config)
+        """, font_config=font_config, **fetcher_kwargs)
         css_list.append(gujarati_fonts_css)
         
         # Add FontAwesome CSS if file doesn't exist
@@ -222,7 +236,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
                 .fa-clock:before { content: "\\f017"; }
                 .fa-language:before { content: "\\f1ab"; }
                 .fa-file-pdf:before { content: "\\f1c1"; }
-            """, font_config=font_config)
+            """, font_config=font_config, **fetcher_kwargs)
             css_list.append(fontawesome_css)
         
         # Skip wkhtmltopdf attempt since it requires sudo permissions
@@ -256,24 +270,6 @@ def create_modern_pdf(articles, titles, output_filename=None):
                 print("All decodings failed, using brute force approach")
                 html_content = sanitized_bytes.decode('utf-8', errors='replace')
             
-            # Generate PDF with proper page counter using string-based approach
-            document = HTML(string=html_content, base_url=os.path.dirname(html_path)).render(
-                stylesheets=css_list, 
-                font_config=font_config,
-                presentational_hints=True  # Enable presentational hints for better page breaks
-            )
-            
-            # Get actual page count
-            actual_pages = len(document.pages)
-            
-            # Update context with actual page count
-            context['total_pages'] = actual_pages
-            
-            # Re-render HTML with accurate page count
-            html_content = template.render(**context)
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
             # Add custom CSS to force page breaks
             page_break_css = CSS(string="""
                 @page {
@@ -331,11 +327,11 @@ def create_modern_pdf(articles, titles, output_filename=None):
                     font-size: 12pt !important;
                     margin-top: 5px !important;
                 }
-            """)
+            """, **fetcher_kwargs)
             css_list.append(page_break_css)
             
-            # Generate final PDF with string-based approach using a different renderer configuration
-            document = HTML(string=html_content, base_url=os.path.dirname(html_path)).render(
+            # Lay the document out once, with the final stylesheets and zoom
+            document = HTML(string=html_content, base_url=os.path.dirname(html_path), **fetcher_kwargs).render(
                 stylesheets=css_list, 
                 font_config=font_config,
                 presentational_hints=True,  # Enable presentational hints for better page breaks
@@ -344,7 +340,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
             )
             document.write_pdf(pdf_path)
                 
-            print(f"Modern PDF created using string-based approach: {pdf_path}")
+            print(f"Modern PDF created using string-based approach: {pdf_path} ({len(document.pages)} pages)")
             return pdf_path
         except Exception as string_error:
             print(f"String-based rendering failed: {str(string_error)}")
@@ -377,7 +373,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
                 with open(html_path, 'w', encoding='utf-8') as f:
                     f.write(html_content)
                 
-                document = HTML(filename=html_path, base_url=os.path.dirname(html_path), encoding='utf-8').render(stylesheets=css_list, font_config=font_config)
+                document = HTML(filename=html_path, base_url=os.path.dirname(html_path), encoding='utf-8', **fetcher_kwargs).render(stylesheets=css_list, font_config=font_config)
                 document.write_pdf(pdf_path)
                     
                 print(f"Modern PDF created with file-based approach: {pdf_path}")
@@ -389,7 +385,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
         print("Trying with different encoding...")
         try:
             # Try with a different encoding
-            document = HTML(filename=html_path, base_url=os.path.dirname(html_path), encoding='latin-1').render(stylesheets=css_list, font_config=font_config)
+            document = HTML(filename=html_path, base_url=os.path.dirname(html_path), encoding='latin-1', **fetcher_kwargs).render(stylesheets=css_list, font_config=font_config)
             document.write_pdf(pdf_path)
             print(f"PDF created with alternate encoding: {pdf_path}")
             return pdf_path
@@ -414,7 +410,7 @@ def create_modern_pdf(articles, titles, output_filename=None):
                     f.write(sanitized)
                 
                 # Try one more time with sanitized content
-                document = HTML(filename=html_path, base_url=os.path.dirname(html_path)).render(stylesheets=css_list, font_config=font_config)
+                document = HTML(filename=html_path, base_url=os.path.dirname(html_path), **fetcher_kwargs).render(stylesheets=css_list, font_config=font_config)
                 document.write_pdf(pdf_path)
                 print(f"PDF created after sanitizing HTML: {pdf_path}")
                 return pdf_path
@@ -476,35 +472,3 @@ def should_filter_block(block, article):
         return True
     
     return False
-
-def estimate_total_pages(articles):
-    """
-    Estimate the total number of pages based on content.
-    
-    Args:
-        articles: List of processed articles
-    
-    Returns:
-        int: Estimated number of pages
-    """
-    # Start with 1 for the cover page
-    estimated_pages = 1
-    
-    # Rough estimate: each article takes about 1-2 pages depending on content
-    for article in articles:
-        content_length = 0
-        if 'content' in article:
-            content_length = len(article['content'])
-        
-        # Basic heuristic: longer content = more pages
-        if content_length <= 3:
-            estimated_pages += 1
-        elif content_length <= 8:
-            estimated_pages += 2
-        else:
-            estimated_pages += 3
-    
-    # Add 1 for the channel promotion and footer
-    estimated_pages += 1
-    
-    return estimated_pages 
\ No newline at end of file
@@ -0,0 +1,288 @@
+import threading
+from datetime import datetime, timedelta
+import gridfs
+import pymongo
+from pymongo import UpdateOne
+from db_utils import mongo_manager
+from config import (REMOTE_CACHE_ENABLED, REMOTE_CACHE_PREFIX, REMOTE_CACHE_TTL_DAYS,
+                    REMOTE_CACHE_FLUSH_INTERVAL)
+
+class RemoteCache:
+    """
+    Second cache tier in MongoDB, shared by every machine that runs the job.
+
+    The local caches (translation memory, article cache, image store) stay the first
+    tier. They look here only on a local miss and copy what they find to disk
+    (read-through), and hand new entries to put() / put_blob(), which only queue
+    them: a background thread writes the queue every flush_interval seconds and
+    close() writes the rest (write-behind), so a slow database never holds up a run.
+    prefetch() pulls the most recently updated entries in one query at startup.
+
+    Records are documents {namespace, key, value, updated_at, expires_at} in the
+    <prefix>_records collection, removed by a TTL index once expires_at has passed.
+    Blobs (processed images) are GridFS files in the <prefix>_blobs bucket, named
+    after their key; expired blobs are deleted by prune(), because GridFS chunks
+    cannot be removed by a TTL index. Reading or rewriting an entry pushes its
+    expiry back by ttl_days.
+    """
+
+    def __init__(self, manager=mongo_manager, prefix=REMOTE_CACHE_PREFIX, ttl_days=REMOTE_CACHE_TTL_DAYS,
+                 flush_interval=REMOTE_CACHE_FLUSH_INTERVAL, enabled=REMOTE_CACHE_ENABLED):
+        self.manager = manager
+        self.prefix = prefix
+        self.ttl = timedelta(days=ttl_days)
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._attempted = False
+        self._records = None
+        self._files = None
+        self._bucket = None
+        self._lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        # Separate from _lock, which is held while connecting, so put() never waits for a connection
+        self._flusher_lock = threading.Lock()
+        self._pending = {}
+        self._pending_blobs = {}
+        self._touched = set()
+        self._touched_blobs = set()
+        self._flusher = None
+        self._stop = threading.Event()
+        self.stats = {'hits': 0, 'misses': 0, 'prefetched': 0, 'written': 0, 'blobs_written': 0,
+                      'evicted': 0, 'errors': 0}
+
+    def _connect(self):
+        """Open the collections on first use; returns False if MongoDB is not available."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._attempted:
+                return self._records is not None
+            self._attempted = True
+            client, _ = self.manager.connect()
+            if client is None:
+                print("  ✗ MongoDB cache tier not available, using the local caches only")
+                return False
+            try:
+                db = client[self.manager.database_name]
+                records = db[f"{self.prefix}_records"]
+                records.create_index([("namespace", pymongo.ASCENDING), ("key", pymongo.ASCENDING)], unique=True)
+                records.create_index([("namespace", pymongo.ASCENDING), ("updated_at", pymongo.DESCENDING)])
+                records.create_index([("expires_at", pymongo.ASCENDING)], expireAfterSeconds=0)
+                files = db[f"{self.prefix}_blobs.files"]
+                files.create_index([("metadata.namespace", pymongo.ASCENDING), ("filename", pymongo.ASCENDING)])
+                files.create_index([("metadata.expires_at", pymongo.ASCENDING)])
+                self._bucket = gridfs.GridFSBucket(db, bucket_name=f"{self.prefix}_blobs")
+                self._files = files
+                self._records = records
+            except pymongo.errors.PyMongoError as e:
+                print(f"  ✗ Could not open the MongoDB cache tier: {str(e)}")
+                return False
+            return True
+
+    def _expiry(self):
+        return datetime.now() + self.ttl
+
+    def get_many(self, namespace, keys):
+        """
+        Look up records by key.
+
+        Args:
+            namespace: "translation", "article", ...
+            keys: Record keys
+
+        Returns:
+            dict: key -> value for the records found
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys or not self._connect():
+            return {}
+        found = {}
+        try:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cursor = self._records.find({"namespace": namespace, "key": {"$in": chunk}},
+                                            {"key": 1, "value": 1, "_id": 0})
+                found.update((doc["key"], doc["value"]) for doc in cursor)
+        except pymongo.errors.PyMongoError as e:
+            self.stats['errors'] += 1
+            print(f"  ✗ MongoDB cache lookup failed: {str(e)}")
+            return {}
+        with self._queue_lock:
+            self._touched.update((namespace, key) for key in found)
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def get_blob(self, namespace, key):
+        """
+        Read a blob.
+
+        Returns:
+            tuple: (bytes, metadata dict), or None if it is not stored
+        """
+        if not self._connect():
+            return None
+        try:
+            file = self._files.find_one({"metadata.namespace": namespace, "filename": key},
+                                        sort=[("uploadDate", pymongo.DESCENDING)])
+            if file is None:
+                self.stats['misses'] += 1
+                return None
+            data = self._bucket.open_download_stream(file["_id"]).read()
+        except (pymongo.errors.PyMongoError, gridfs.errors.GridFSError) as e:
+            self.stats['errors'] += 1
+            print(f"  ✗ MongoDB cache blob lookup failed: {str(e)}")
+            return None
+        with self._queue_lock:
+            self._touched_blobs.add((namespace, key))
+        self.stats['hits'] += 1
+        return data, file.get("metadata", {})
+
+    def prefetch(self, namespace, limit):
+        """
+        Read the most recently updated records of a namespace in one query.
+
+        Returns:
+            list: (key, value) tuples
+        """
+        if not limit or not self._connect():
+            return []
+        try:
+            cursor = (self._records.find({"namespace": namespace}, {"key": 1, "value": 1, "_id": 0})
+                      .sort("updated_at", pymongo.DESCENDING).limit(limit))
+            records = [(doc["key"], doc["value"]) for doc in cursor]
+        except pymongo.errors.PyMongoError as e:
+            self.stats['errors'] += 1
+            print(f"  ✗ MongoDB cache prefetch failed: {str(e)}")
+            return []
+        self.stats['prefetched'] += len(records)
+        return records
+
+    def prefetch_blobs(self, namespace, limit, skip=None):
+        """
+        Read the most recently uploaded blobs of a namespace.
+
+        Args:
+            namespace: Blob namespace
+            limit: Maximum number of blobs to consider
+            skip: Function of a key returning True for blobs that are not needed
+
+        Yields:
+            tuple: (key, bytes, metadata dict)
+        """
+        if not limit or not self._connect():
+            return
+        try:
+            files = list(self._files.find({"metadata.namespace": namespace}, {"filename": 1, "metadata": 1})
+                         .sort("uploadDate", pymongo.DESCENDING).limit(limit))
+            for file in files:
+                if skip and skip(file["filename"]):
+                    continue
+                data = self._bucket.open_download_stream(file["_id"]).read()
+                self.stats['prefetched'] += 1
+                yield file["filename"], data, file.get("metadata", {})
+        except (pymongo.errors.PyMongoError, gridfs.errors.GridFSError) as e:
+            self.stats['errors'] += 1
+            print(f"  ✗ MongoDB cache blob prefetch failed: {str(e)}")
+
+    def put(self, namespace, key, value):
+        """Queue a record for the next write-behind flush."""
+        if not self.enabled:
+            return
+        with self._queue_lock:
+            self._pending[(namespace, key)] = value
+        self._start_flusher()
+
+    def put_blob(self, namespace, key, data, metadata=None):
+        """Queue a blob for the next write-behind flush."""
+        if not self.enabled:
+            return
+        with self._queue_lock:
+            self._pending_blobs[(namespace, key)] = (data, metadata or {})
+        self._start_flusher()
+
+    def _start_flusher(self):
+        with self._flusher_lock:
+            if self._flusher is None and not self._stop.is_set():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the queued records and blobs, and extend the expiry of the entries read."""
+        with self._queue_lock:
+            pending, self._pending = self._pending, {}
+            pending_blobs, self._pending_blobs = self._pending_blobs, {}
+            touched, self._touched = self._touched, set()
+            touched_blobs, self._touched_blobs = self._touched_blobs, set()
+        if not (pending or pending_blobs or touched or touched_blobs) or not self._connect():
+            return
+
+        now = datetime.now()
+        expires_at = self._expiry()
+        try:
+            requests = [UpdateOne({"namespace": namespace, "key": key},
+                                  {"$set": {"value": value, "updated_at": now, "expires_at": expires_at}},
+                                  upsert=True)
+                        for (namespace, key), value in pending.items()]
+            requests.extend(UpdateOne({"namespace": namespace, "key": key}, {"$set": {"expires_at": expires_at}})
+                            for namespace, key in touched - set(pending))
+            if requests:
+                self._records.bulk_write(requests, ordered=False)
+                self.stats['written'] += len(pending)
+
+            for (namespace, key), (data, metadata) in pending_blobs.items():
+                query = {"metadata.namespace": namespace, "filename": key}
+                # Blobs are content-addressed, so an existing one only needs its expiry extended
+                if self._files.update_many(query, {"$set": {"metadata.expires_at": expires_at}}).matched_count:
+                    continue
+                self._bucket.upload_from_stream(key, data, metadata=dict(metadata, namespace=namespace,
+                                                                         expires_at=expires_at))
+                self.stats['blobs_written'] += 1
+            for namespace, key in touched_blobs - set(pending_blobs):
+                self._files.update_many({"metadata.namespace": namespace, "filename": key},
+                                        {"$set": {"metadata.expires_at": expires_at}})
+        except Exception as e:
+            # A cache write that fails only costs a warm start, the entries are dropped
+            self.stats['errors'] += 1
+            print(f"  ✗ Could not write to the MongoDB cache tier: {str(e)}")
+
+    def prune(self):
+        """Delete expired blobs (expired records are removed by MongoDB's TTL index)."""
+        if not self._connect():
+            return 0
+        removed = 0
+        try:
+            for file in self._files.find({"metadata.expires_at": {"$lt": datetime.now()}}, {"_id": 1}):
+                self._bucket.delete(file["_id"])
+                removed += 1
+        except (pymongo.errors.PyMongoError, gridfs.errors.GridFSError) as e:
+            self.stats['errors'] += 1
+            print(f"  ✗ MongoDB cache eviction failed: {str(e)}")
+        self.stats['evicted'] += removed
+        return removed
+
+    def close(self):
+        """Stop the background flusher, write what is still queued and evict expired blobs."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        if self._attempted:
+            self.prune()
+
+    def report(self):
+        """Print the second tier counters for this run."""
+        if not self._attempted:
+            return
+        print("MongoDB cache tier statistics:")
+        print(f"  • Read-through hits: {self.stats['hits']}, misses: {self.stats['misses']}, "
+              f"prefetched: {self.stats['prefetched']}")
+        print(f"  • Written: {self.stats['written']} records, {self.stats['blobs_written']} blobs; "
+              f"expired blobs removed: {self.stats['evicted']}; errors: {self.stats['errors']}")
+
+# Shared second tier used by the local caches
+remote_cache = RemoteCache()
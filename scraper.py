@@ -1,138 +1,380 @@
-import requests
-from bs4 import BeautifulSoup
-import io
-from PIL import Image
+import asyncio
+import aiohttp
+from bs4 import Tag
+from html_parsing import parse_html
 import os
-from translation import translate_to_gujarati
-import base64
-from config import BASE_URL, PAGE_COUNT
+from translation import translate_planned_async
+from config import (BASE_URL, PAGE_COUNT, USER_AGENT, REQUEST_TIMEOUT, LISTING_CONCURRENCY, FETCH_RETRIES,
+                    ARTICLE_CONCURRENCY, ARTICLE_TIMEOUT,
+                    IMAGE_BOX_WIDTH, IMAGE_BOX_MAX_HEIGHT, IMAGE_TARGET_DPI, IMAGE_JPEG_QUALITY, IMAGE_WORKERS,
+                    CRAWL_MODES, CRAWL_MODE, INCREMENTAL_MAX_PAGES, INCREMENTAL_STOP_PAGES,
+                    BACKFILL_PAGE_COUNT, BACKFILL_CHECKPOINT_FILE)
 import re
-from db_utils import get_mongodb_connection, save_scraped_url, get_all_scraped_urls, is_url_scraped
+import json
+import base64
+from http_cache import cached_fetch
+from host_governor import THROTTLE_STATUSES
+from archive import raw_archive, article_info_key
+from article_cache import article_cache, article_source_hash
+from image_pipeline import convert_image, get_image_pool, to_data_uri
+from image_store import image_store, path_from_uri
+from db_utils import url_registry, scraped_url_writer
+from seen_set import seen_urls
 import random
 from datetime import datetime
 
-def fetch_article_urls(base_url, pages):
-    """Fetch article URLs from multiple pages of GKToday current affairs."""
-    all_urls = []
+def create_session(concurrency, timeout=REQUEST_TIMEOUT):
+    """
+    Create a keep-alive aiohttp session for scraper requests.
+    
+    Args:
+        concurrency: Maximum number of open connections
+        timeout: Default timeout in seconds for each request
+    
+    Returns:
+        aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    headers = {'User-Agent': USER_AGENT}
+    return aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers)
+
+async def fetch_url(session, url, kind, timeout=None):
+    """
+    Fetch a URL through the HTTP cache and record it in the raw archive.
+    In replay mode the content is served from the archive instead.
+    
+    Args:
+        session: aiohttp.ClientSession to use
+        url: URL to fetch
+        kind: Archive kind ("listing", "article" or "image")
+        timeout: Optional request timeout in seconds
+    
+    Returns:
+        bytes: Response body
+    """
+    if raw_archive.replay:
+        content = raw_archive.get(url)
+        if content is None:
+            raise FileNotFoundError(f"{url} is not in the {raw_archive.replay_date} archive")
+        return content
+    
+    # The host governor pauses the host after a 429/5xx (honouring Retry-After),
+    # so a retry simply waits for it to let the request through again
+    for attempt in range(1, FETCH_RETRIES + 1):
+        try:
+            content = await cached_fetch(session, url, timeout=timeout)
+            break
+        except aiohttp.ClientResponseError as e:
+            if e.status not in THROTTLE_STATUSES or attempt == FETCH_RETRIES:
+                raise
+            print(f"  • {url} answered {e.status}, retrying (attempt {attempt}/{FETCH_RETRIES})")
+    
+    await asyncio.to_thread(raw_archive.record, url, content, kind)
+    return content
+
+async def fetch_listing_page(session, semaphore, page_url):
+    """
+    Fetch a single listing page over the shared aiohttp session.
+    
+    Args:
+        session: aiohttp.ClientSession used for all listing requests
+        semaphore: asyncio.Semaphore limiting concurrent requests
+        page_url: URL of the listing page
+    
+    Returns:
+        bytes: Raw HTML of the page
+    """
+    async with semaphore:
+        return await fetch_url(session, page_url, 'listing')
+
+async def fetch_listing_pages(session, base_url, pages, concurrency=LISTING_CONCURRENCY):
+    """
+    Fetch listing pages concurrently over the crawl's keep-alive aiohttp session.
+    
+    Args:
+        session: aiohttp.ClientSession shared by every window of the crawl
+        base_url: Base URL of the current affairs listing
+        pages: Iterable of page numbers to fetch
+        concurrency: Maximum number of pages fetched at the same time
+    
+    Returns:
+        list: (page, page_url, content, error) tuples in the same order as pages
+    """
+    pages = list(pages)
+    page_urls = [base_url if page == 1 else f"{base_url}page/{page}/" for page in pages]
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    results = await asyncio.gather(
+        *(fetch_listing_page(session, semaphore, page_url) for page_url in page_urls),
+        return_exceptions=True
+    )
+    
+    listing = []
+    for page, page_url, result in zip(pages, page_urls, results):
+        if isinstance(result, BaseException):
+            listing.append((page, page_url, None, result))
+        else:
+            listing.append((page, page_url, result, None))
+    return listing
+
+def load_backfill_checkpoint(base_url):
+    """
+    Load the backfill checkpoint for the given listing, if one exists.
+    
+    Args:
+        base_url: Base URL of the current affairs listing
+    
+    Returns:
+        dict: Checkpoint with 'last_page' and 'urls', or None if there is nothing to resume
+    """
+    try:
+        if not os.path.exists(BACKFILL_CHECKPOINT_FILE):
+            return None
+        with open(BACKFILL_CHECKPOINT_FILE, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('base_url') != base_url:
+            return None
+        return checkpoint
+    except Exception as e:
+        print(f"  ✗ Could not read backfill checkpoint: {str(e)}")
+        return None
+
+def save_backfill_checkpoint(base_url, last_page, urls, finished=False):
+    """
+    Save backfill progress so an interrupted backfill can resume where it stopped.
+    
+    Args:
+        base_url: Base URL of the current affairs listing
+        last_page: Last listing page that was fully processed
+        urls: URLs collected so far, in page order
+        finished: True once the crawl reached its last page
+    """
+    checkpoint = {
+        'base_url': base_url,
+        'last_page': last_page,
+        'finished': finished,
+        'urls': list(urls),
+        'updated_at': datetime.now().isoformat(),
+    }
+    try:
+        tmp_path = f"{BACKFILL_CHECKPOINT_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, BACKFILL_CHECKPOINT_FILE)
+    except Exception as e:
+        print(f"  ✗ Could not save backfill checkpoint: {str(e)}")
+
+def clear_backfill_checkpoint():
+    """Remove the backfill checkpoint once its articles have been published."""
+    if os.path.exists(BACKFILL_CHECKPOINT_FILE):
+        os.remove(BACKFILL_CHECKPOINT_FILE)
+        print(f"Backfill checkpoint cleared: {BACKFILL_CHECKPOINT_FILE}")
+
+def default_page_count(mode):
+    """Return the number of listing pages to scan for a crawl mode."""
+    if mode == 'backfill':
+        return BACKFILL_PAGE_COUNT
+    if mode == 'incremental':
+        return INCREMENTAL_MAX_PAGES
+    return PAGE_COUNT
+
+async def fetch_article_urls(base_url, pages=None, mode=CRAWL_MODE):
+    """
+    Fetch article URLs from multiple pages of GKToday current affairs.
+    
+    Args:
+        base_url: Base URL of the current affairs listing
+        pages: Maximum number of listing pages to scan (defaults depend on the mode)
+        mode: "full" scans every page, "incremental" stops once INCREMENTAL_STOP_PAGES
+              consecutive pages contain only known URLs, and "backfill" pages deep
+              while checkpointing its progress so it can resume after a failure
+    
+    Returns:
+        list: URLs to process
+    """
+    if mode not in CRAWL_MODES:
+        raise ValueError(f"Unknown crawl mode: {mode} (expected one of {', '.join(CRAWL_MODES)})")
+    if not pages:
+        pages = default_page_count(mode)
+    
+    # Ordered set of URLs (dict keys keep insertion order)
+    all_urls = {}
     start_time = datetime.now()
     
-    # Step 1: First scrape all URLs from the website
+    # Step 1: Open the scraped URL registry (MongoDB by default) and bring the local
+    # seen-URL snapshot up to date. Each listing page's URLs are then checked as the
+    # page is scanned: the snapshot answers "definitely new" locally and only
+    # possible hits are looked up in the registry
+    label = url_registry.label
     print(f"\n{'='*80}")
-    print(f"STEP 1: SCRAPING URLS FROM WEBSITE ({start_time.strftime('%H:%M:%S')})")
+    print(f"STEP 1: SYNCING SCRAPED URLS FROM {label.upper()} ({start_time.strftime('%H:%M:%S')})")
     print(f"{'='*80}")
-    print(f"Source: {base_url}")
-    print(f"Pages to scan: {pages}")
     
-    for page in range(1, pages + 1):
-        page_start = datetime.now()
-        try:
-            page_url = base_url if page == 1 else f"{base_url}page/{page}/"
-            print(f"\nScanning page {page}/{pages}: {page_url}")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(page_url, headers=headers, timeout=20)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            page_urls = []
-            
-            # Method 1: Find divs with class="post-data"
-            post_data_divs = soup.find_all('div', class_='post-data')
-            for div in post_data_divs:
-                h3_tag = div.find('h3')
-                if h3_tag:
-                    link = h3_tag.find('a')
-                    if link and link.get('href'):
-                        article_url = link['href']
-                        if article_url not in all_urls and article_url not in page_urls and should_include_url(article_url):
-                            page_urls.append(article_url)
-            
-            # Method 2: Find divs with class="home-post-item"
-            home_post_items = soup.find_all('div', class_='home-post-item')
-            for div in home_post_items:
-                h3_tag = div.find('h3')
-                if h3_tag:
-                    link = h3_tag.find('a')
-                    if link and link.get('href'):
-                        article_url = link['href']
-                        if article_url not in all_urls and article_url not in page_urls and should_include_url(article_url):
-                            page_urls.append(article_url)
-            
-            # Method 3: Look for all h3 elements with links that look like articles
-            content_divs = soup.find_all('div')
-            for div in content_divs:
-                h3_elem = div.find('h3')
-                if h3_elem:
-                    a_elem = h3_elem.find('a')
-                    if a_elem and a_elem.get('href'):
-                        article_url = a_elem['href']
-                        # Only include GKToday URLs that are likely to be articles
-                        if ('gktoday.in' in article_url and 
-                            not article_url.endswith('/') and 
-                            '/page/' not in article_url and
-                            article_url not in all_urls and 
-                            article_url not in page_urls and
-                            should_include_url(article_url)):
-                            page_urls.append(article_url)
-            
-            # Add all new URLs from this page to our master list
-            all_urls.extend(page_urls)
-            
-            # Display progress for this page
-            page_time = (datetime.now() - page_start).total_seconds()
-            print(f"  ✓ Found {len(page_urls)} new URLs on page {page} ({page_time:.1f}s)")
-            if page_urls:
-                for i, url in enumerate(page_urls, 1):
-                    print(f"    {i}. {url}")
-            
-        except Exception as e:
-            print(f"  ✗ Error fetching URLs from page {page}: {str(e)}")
+    # Candidate URLs known to be scraped, and every candidate looked up so far
+    previously_scraped_urls = set()
+    checked_urls = set()
+    registry_available = False
+    
+    if raw_archive.replay:
+        print(f"  • Replay mode: using the articles archived on {raw_archive.replay_date} instead of {label}")
+    else:
+        await asyncio.to_thread(seen_urls.load)
+        registry_available = await url_registry.connect_async()
+        
+        if not registry_available:
+            if seen_urls.ready:
+                print(f"  ✗ Failed to connect to {label}. Using the local seen-URL snapshot "
+                      f"(synced up to {seen_urls.watermark:%Y-%m-%d %H:%M:%S}).")
+            else:
+                print(f"  ✗ Failed to connect to {label}. Proceeding without URL filtering.")
+                # Without a seen-check every page looks new, so don't let an incremental crawl run deep
+                if mode == 'incremental':
+                    pages = min(pages, PAGE_COUNT)
+                    print(f"  • Incremental crawl limited to {pages} pages")
+        else:
+            try:
+                synced = await asyncio.to_thread(seen_urls.sync, url_registry)
+                await asyncio.to_thread(seen_urls.save)
+                if seen_urls.enabled:
+                    print(f"  ✓ Seen-URL snapshot synced: {synced} new records, {seen_urls.bloom.count} URLs in total")
+            except Exception as e:
+                print(f"  ✗ Error syncing the seen-URL snapshot: {str(e)}")
+            print(f"  ✓ Connected to {url_registry.describe()}, listing URLs will be checked page by page")
+    
+    async def check_scraped(urls):
+        """Look up the candidate URLs not checked yet and return the ones already scraped."""
+        unchecked = [url for url in urls if url not in checked_urls]
+        checked_urls.update(unchecked)
+        _, seen, possible = seen_urls.partition(unchecked)
+        previously_scraped_urls.update(seen)
+        if possible:
+            if registry_available:
+                previously_scraped_urls.update(await asyncio.to_thread(url_registry.find_scraped, possible))
+            elif seen_urls.ready:
+                # The registry is down: trust the filter, at worst skipping a few new articles
+                previously_scraped_urls.update(possible)
+        return {url for url in urls if url in previously_scraped_urls}
     
     # Display summary for Step 1
     step1_time = (datetime.now() - start_time).total_seconds()
     print(f"\nStep 1 Summary:")
-    print(f"  • Total URLs found: {len(all_urls)}")
+    print(f"  • {label} seen-check: {'available' if registry_available else 'not available'}")
+    print(f"  • Local seen-URL snapshot: {'ready' if seen_urls.ready else 'not available'}")
     print(f"  • Time taken: {step1_time:.1f} seconds")
     
-    # Step 2: Get all URLs from MongoDB
+    # Step 2: Scrape URLs from the website
     step2_start = datetime.now()
     print(f"\n{'='*80}")
-    print(f"STEP 2: RETRIEVING SCRAPED URLS FROM MONGODB ({step2_start.strftime('%H:%M:%S')})")
+    print(f"STEP 2: SCRAPING URLS FROM WEBSITE ({step2_start.strftime('%H:%M:%S')})")
     print(f"{'='*80}")
+    print(f"Source: {base_url}")
+    print(f"Crawl mode: {mode}")
+    print(f"Pages to scan: up to {pages} ({LISTING_CONCURRENCY} at a time)")
     
-    client, collection = get_mongodb_connection()
-    previously_scraped_urls = set()
+    next_page = 1
+    finished = False
+    if mode == 'backfill':
+        checkpoint = load_backfill_checkpoint(base_url)
+        if checkpoint:
+            all_urls = dict.fromkeys(checkpoint.get('urls', []))
+            next_page = checkpoint.get('last_page', 0) + 1
+            finished = checkpoint.get('finished', False)
+            print(f"  • Resuming backfill from page {next_page} with {len(all_urls)} URLs already collected")
     
-    if client is None or collection is None:
-        print("  ✗ Failed to connect to MongoDB. Proceeding without URL filtering.")
-    else:
-        try:
-            # Get previously scraped URLs from MongoDB
-            previously_scraped_urls = get_all_scraped_urls(collection)
-            print(f"  ✓ Successfully retrieved {len(previously_scraped_urls)} previously scraped URLs")
+    pages_scanned = 0
+    known_streak = 0
+    stop_reason = None
+    # The backfill checkpoint never moves past a page that could not be read, so
+    # the pages from the first failed one on are fetched again when it resumes
+    first_failed_page = None
+    if finished:
+        stop_reason = "backfill checkpoint already complete"
+    
+    # Fetch listing pages concurrently one window at a time, then process each
+    # window in page order so that deduplication and early stopping stay deterministic.
+    # Incremental crawls start with a single page and widen the window as long as
+    # new URLs keep turning up, so a normal daily run touches as few pages as possible.
+    window_size = 1 if mode == 'incremental' else LISTING_CONCURRENCY
+    # One keep-alive session for every window, so later windows reuse its connections
+    async with create_session(LISTING_CONCURRENCY) as session:
+        while stop_reason is None and next_page <= pages:
+            window = range(next_page, min(next_page + window_size, pages + 1))
+            window_size = min(window_size * 2, LISTING_CONCURRENCY)
+            listing = await fetch_listing_pages(session, base_url, window)
+            
+            for page, page_url, content, error in listing:
+                next_page = page + 1
+                pages_scanned += 1
+                print(f"\nScanning page {page}/{pages}: {page_url}")
+                if isinstance(error, aiohttp.ClientResponseError) and error.status == 404:
+                    # Like an empty listing page, a missing one is past the end of the archive
+                    stop_reason = f"page {page} does not exist"
+                    break
+                if error is not None:
+                    print(f"  ✗ Error fetching URLs from page {page}: {str(error) or type(error).__name__}")
+                    first_failed_page = first_failed_page or page
+                    continue
+                
+                page_start = datetime.now()
+                try:
+                    # Only the listing containers are parsed; if the layout changed and
+                    # none are found, fall back to the whole page
+                    listing_urls = extract_listing_urls(parse_html(content, scope='listing'))
+                    if not listing_urls:
+                        listing_urls = extract_listing_urls(parse_html(content))
+                    
+                    # An empty listing page means we walked past the end of the archive
+                    if not listing_urls:
+                        stop_reason = f"page {page} has no articles"
+                        break
+                    
+                    # Collect this page's links in a single pass and keep only
+                    # the ones we have not already seen on an earlier page
+                    page_urls = [url for url in listing_urls if url not in all_urls]
+                    
+                    # Add all new URLs from this page to our master list
+                    all_urls.update(dict.fromkeys(page_urls))
+                    scraped_on_page = await check_scraped(page_urls)
+                    new_on_page = [url for url in page_urls if url not in scraped_on_page]
+                    
+                    # Display progress for this page
+                    page_time = (datetime.now() - page_start).total_seconds()
+                    print(f"  ✓ Found {len(page_urls)} URLs on page {page}, {len(new_on_page)} not yet scraped ({page_time:.1f}s)")
+                    if page_urls:
+                        for i, url in enumerate(page_urls, 1):
+                            print(f"    {i}. {url}")
+                    
+                    if mode == 'incremental':
+                        known_streak = 0 if new_on_page else known_streak + 1
+                        if known_streak >= INCREMENTAL_STOP_PAGES:
+                            stop_reason = f"{known_streak} consecutive page(s) already scraped"
+                            break
+                    
+                except Exception as e:
+                    print(f"  ✗ Error fetching URLs from page {page}: {str(e)}")
+                    first_failed_page = first_failed_page or page
             
-            # Display some sample URLs from MongoDB (up to 5)
-            if previously_scraped_urls:
-                sample_urls = list(previously_scraped_urls)[:5]
-                print(f"  • Sample URLs from database:")
-                for i, url in enumerate(sample_urls, 1):
-                    print(f"    {i}. {url}")
-                if len(previously_scraped_urls) > 5:
-                    print(f"    ... and {len(previously_scraped_urls) - 5} more")
-        except Exception as e:
-            print(f"  ✗ Error retrieving scraped URLs: {str(e)}")
-        finally:
-            # Close MongoDB connection after getting the URLs
-            if client is not None:
-                client.close()
-                print("  • MongoDB connection closed")
+            if mode == 'backfill':
+                if first_failed_page is None:
+                    save_backfill_checkpoint(base_url, next_page - 1, all_urls,
+                                             finished=stop_reason is not None or next_page > pages)
+                else:
+                    save_backfill_checkpoint(base_url, first_failed_page - 1, all_urls)
+    
+    if stop_reason:
+        print(f"\n  • Stopped crawling: {stop_reason}")
+    if mode == 'backfill' and first_failed_page is not None:
+        print(f"  • Page {first_failed_page} could not be read; a resumed backfill starts from it again")
+    
+    all_urls = list(all_urls)
     
     # Display summary for Step 2
     step2_time = (datetime.now() - step2_start).total_seconds()
     print(f"\nStep 2 Summary:")
-    print(f"  • URLs in MongoDB: {len(previously_scraped_urls)}")
+    print(f"  • Pages scanned: {pages_scanned}")
+    print(f"  • Total URLs found: {len(all_urls)}")
     print(f"  • Time taken: {step2_time:.1f} seconds")
     
     # Step 3: Compare and find unique URLs
@@ -141,14 +383,20 @@ def fetch_article_urls(base_url, pages):
     print(f"STEP 3: COMPARING URLS TO FIND UNIQUE ONES ({step3_start.strftime('%H:%M:%S')})")
     print(f"{'='*80}")
     
+    # URLs restored from a backfill checkpoint have not been looked up in this run
+    await check_scraped(all_urls)
     unique_urls = []
     for url in all_urls:
         if url not in previously_scraped_urls:
             unique_urls.append(url)
     
+    # A replayed run processes exactly the articles that were archived that day
+    if raw_archive.replay:
+        unique_urls = [url for url in unique_urls if raw_archive.contains(url, kind='article')]
+    
     # Display results
     print(f"  • Total URLs found from website: {len(all_urls)}")
-    print(f"  • URLs already in MongoDB: {len(previously_scraped_urls)}")
+    print(f"  • URLs already in {label}: {len(previously_scraped_urls)}")
     print(f"  • Unique URLs for processing: {len(unique_urls)}")
     
     if unique_urls:
@@ -185,6 +433,57 @@ def fetch_article_urls(base_url, pages):
         print(f"• Total processing time: {total_time:.1f} seconds")
         return random_urls
 
+LISTING_CONTAINER_CLASSES = ('post-data', 'home-post-item')
+
+def extract_listing_urls(soup):
+    """
+    Extract candidate article URLs from a parsed listing page in a single pass.
+    
+    Every <h3> is visited once in document order and its first link is kept if it
+    sits inside a known listing container ("post-data" or "home-post-item"), or if
+    it looks like a GKToday article link inside any other <div>.
+    
+    Args:
+        soup: BeautifulSoup tree of a listing page
+    
+    Returns:
+        list: Unique article URLs in document order
+    """
+    urls = {}
+    for h3 in soup.find_all('h3'):
+        link = h3.find('a')
+        if not link or not link.get('href'):
+            continue
+        article_url = link['href']
+        if article_url in urls:
+            continue
+        
+        # Walk the ancestors once to see whether the heading is inside a div
+        # and whether that div is one of the known listing containers
+        in_div = False
+        in_container = False
+        for parent in h3.parents:
+            if parent.name != 'div':
+                continue
+            in_div = True
+            if any(cls in LISTING_CONTAINER_CLASSES for cls in parent.get('class', [])):
+                in_container = True
+                break
+        
+        if not in_div:
+            continue
+        
+        # Outside the listing containers only accept GKToday links that are likely to be articles
+        if not in_container and ('gktoday.in' not in article_url or
+                                 article_url.endswith('/') or
+                                 '/page/' in article_url):
+            continue
+        
+        if should_include_url(article_url):
+            urls[article_url] = None
+    
+    return list(urls)
+
 def should_include_url(url):
     """
     Check if a URL should be included in scraping.
@@ -222,33 +521,264 @@ def should_include_url(url):
     
     return True
 
-def download_and_convert_image(url):
-    """Download and convert image to base64 for embedding in HTML."""
+async def download_and_convert_image(session, url):
+    """
+    Download an article image and prepare it for the PDF.
+    
+    Returns:
+        str: file:// URL of the processed image in the image store (or a data URI
+             when the store is disabled), None if the image could not be processed
+    """
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        content = response.content
+        content = await fetch_url(session, url, 'image', timeout=10)
         if len(content) < 100:  # Check for invalid/small images
             print(f"Image at {url} is too small, likely invalid")
             return None
         
-        # Convert image to PNG using Pillow
-        img = Image.open(io.BytesIO(content))
-        if img.mode in ('RGBA', 'P'):  # Convert transparency to white background
-            img = img.convert('RGB')
-        output = io.BytesIO()
-        img.save(output, format='PNG')
-        output.seek(0)
+        # The same downloaded bytes are only decoded once across articles and runs
+        settings = (IMAGE_BOX_WIDTH, IMAGE_BOX_MAX_HEIGHT, IMAGE_TARGET_DPI, IMAGE_JPEG_QUALITY)
+        key = image_store.key(content, settings)
+        stored_url = await asyncio.to_thread(image_store.lookup, key)
+        if stored_url:
+            return stored_url
         
-        # Convert to base64 for embedding in HTML
-        img_str = base64.b64encode(output.getvalue()).decode('utf-8')
-        return f"data:image/png;base64,{img_str}"
+        # Decode, resize and re-encode in the image worker processes so several
+        # articles' images are processed in parallel without blocking the event loop
+        loop = asyncio.get_running_loop()
+        data, mime_type = await loop.run_in_executor(
+            get_image_pool(IMAGE_WORKERS), convert_image, content, *settings)
+        if not image_store.enabled:
+            return to_data_uri(data, mime_type)
+        return await asyncio.to_thread(image_store.put, key, data, mime_type)
     except Exception as e:
-        print(f"Failed to process image from {url}: {str(e)}")
+        print(f"Failed to process image from {url}: {str(e) or type(e).__name__}")
         return None
 
-async def scrape_and_get_content(url):
-    """Scrape article content and process it for PDF generation."""
+def archive_cached_article(url, source_hash, image_url, article_info):
+    """
+    Archive an article served from the article cache. No translations or image
+    were fetched for it in this run, so the finished article and its processed
+    image are archived instead, for a replay of today's run to rebuild it.
+    
+    Args:
+        url: Article URL
+        source_hash: Hash of the extracted source text
+        image_url: Featured image URL (or None)
+        article_info: Cached article information
+    """
+    raw_archive.record(article_info_key(url, source_hash),
+                       json.dumps(article_info, ensure_ascii=False).encode('utf-8'), 'article_info')
+    image = article_info.get('image')
+    if not image_url or not image or raw_archive.contains(image_url):
+        return
+    try:
+        if image.startswith('data:'):
+            data = base64.b64decode(image.split(',', 1)[1])
+        else:
+            with open(path_from_uri(image), 'rb') as f:
+                data = f.read()
+    except (OSError, ValueError) as e:
+        print(f"  ✗ Could not archive the cached image of {url}: {str(e)}")
+        return
+    # Replay runs the archived image through the image pipeline again, which is harmless for a processed image
+    raw_archive.record(image_url, data, 'image')
+
+# Sections removed before content extraction: divs with one of these classes,
+# and the comments section and reply form by id
+REMOVED_SECTION_CLASSES = ('sharethis-inline-share-buttons', 'related-articles', 'post-meta', 'breadcrumb')
+REMOVED_SECTION_IDS = ('comments', 'respond')
+
+# Content elements are skipped when one of their three nearest ancestors matches
+# these markers (as substrings of the class list / id): ShareThis buttons, related
+# articles, comments and the reply form, post meta and breadcrumbs
+EXCLUDED_CLASS_MARKERS = ('sharethis', 'related-articles', 'comments', 'comment-respond', 'post-meta', 'breadcrumb')
+EXCLUDED_ID_MARKERS = ('comments', 'respond')
+EXCLUDED_ANCESTOR_DEPTH = 3
+
+# Post meta / breadcrumb text that might still slip through
+EXCLUDED_TEXT_MARKERS = ('post-date', 'post-categories', 'breadcrumb', 'itemscope', 'schema.org',
+                         'fa fa-calendar', 'fa fa-folder')
+
+CONTENT_TAGS = ('p', 'h2', 'h4', 'ul', 'ol')
+BLOCK_TYPES = {'p': 'paragraph', 'h2': 'heading_2', 'h4': 'heading_4'}
+
+def is_removed_section(tag):
+    """Check whether an element starts a section that is never extracted."""
+    if tag.get('id') in REMOVED_SECTION_IDS:
+        return True
+    return tag.name == 'div' and any(name in REMOVED_SECTION_CLASSES for name in tag.get('class') or ())
+
+def has_excluded_ancestor(tag, depth=EXCLUDED_ANCESTOR_DEPTH):
+    """Check whether one of the nearest ancestors of an element marks it as non-content."""
+    parent = tag.parent
+    for _ in range(depth):
+        if parent is None:
+            return False
+        classes = parent.get('class')
+        if classes:
+            class_string = ' '.join(classes)
+            if any(marker in class_string for marker in EXCLUDED_CLASS_MARKERS):
+                return True
+        element_id = parent.get('id', '')
+        if any(marker in element_id for marker in EXCLUDED_ID_MARKERS):
+            return True
+        parent = parent.parent
+    return False
+
+def iter_content_elements(root, names=CONTENT_TAGS):
+    """
+    Walk a subtree once in document order, pruning removed sections on entry.
+    
+    Args:
+        root: Element to walk
+        names: Tag names to yield
+    
+    Yields:
+        Tag: Matching elements, including ones nested inside other matches
+    """
+    stack = list(reversed(root.contents))
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, Tag) or is_removed_section(node):
+            continue
+        if node.name in names:
+            yield node
+        stack.extend(reversed(node.contents))
+
+def extract_content_blocks(main_content):
+    """
+    Extract the English content blocks of an article in a single tree walk.
+    
+    Args:
+        main_content: Main article element
+    
+    Returns:
+        list: Blocks like {'type': 'paragraph', 'text': ...}; numbered list
+              items also carry a running 'number'
+    """
+    # First try to find the article-content div which contains the main content
+    article_content = main_content.find('div', class_='entry-content')
+    if not article_content:
+        article_content = main_content.find('div', class_='post-content')
+    if not article_content:
+        article_content = main_content
+    
+    # Skip empty elements or those with very little content
+    elements = []
+    for tag in iter_content_elements(article_content):
+        if has_excluded_ancestor(tag):
+            continue
+        text = tag.get_text().strip()
+        if len(text) >= 10:
+            elements.append((tag, text))
+    
+    # If no content elements were found, fall back to any meaningful paragraph
+    if not elements:
+        print("  ⚠️ No content elements found with standard approach, looking for paragraphs...")
+        for p in iter_content_elements(main_content, ('p',)):
+            text = p.get_text().strip()
+            if len(text) > 20:
+                elements.append((p, text))
+        print(f"  • Added {len(elements)} meaningful paragraphs")
+    
+    blocks = []
+    numbered_list_counter = 1
+    for tag, text in elements:
+        lowered = text.lower()
+        if any(marker in lowered for marker in EXCLUDED_TEXT_MARKERS):
+            continue
+        
+        if tag.name in BLOCK_TYPES:
+            blocks.append({'type': BLOCK_TYPES[tag.name], 'text': text})
+        elif tag.name == 'ul':
+            for li in tag.find_all('li'):
+                blocks.append({'type': 'bullet_list', 'text': li.get_text().strip()})
+        elif tag.name == 'ol':
+            for li in tag.find_all('li'):
+                blocks.append({'type': 'numbered_list', 'text': li.get_text().strip(), 'number': numbered_list_counter})
+                numbered_list_counter += 1
+    
+    # Last resort: use the first few paragraphs of the article
+    if not blocks:
+        for p in list(iter_content_elements(main_content, ('p',)))[:3]:
+            text = p.get_text().strip()
+            if len(text) > 20:
+                blocks.append({'type': 'paragraph', 'text': text})
+    
+    return blocks
+
+async def build_article_info(session, heading_text, image_url, source_blocks):
+    """
+    Download the featured image and translate the title and content blocks.
+    
+    Args:
+        session: Shared aiohttp session
+        heading_text: English article title
+        image_url: Featured image URL (or None)
+        source_blocks: English content blocks from extract_content_blocks
+    
+    Returns:
+        dict: Finished article information
+    """
+    # Process image if found
+    image_data = None
+    if image_url:
+        print("• Processing image...")
+        image_data = await download_and_convert_image(session, image_url)
+        if image_data:
+            print("  ✓ Image processed successfully")
+        else:
+            print("  ✗ Failed to process image")
+    
+    # Translate the title and all content blocks together, packed into as few requests as possible
+    print(f"• Translating title and {len(source_blocks)} content blocks to Gujarati...")
+    translations = await translate_planned_async([heading_text] + [block['text'] for block in source_blocks])
+    translated_heading = translations[0]
+    print("  ✓ Translation complete")
+    
+    # Add the article header information
+    article_info = {
+        'gujarati_title': translated_heading,
+        'english_title': heading_text,
+        'image': image_data,
+        'content': []
+    }
+    
+    print("• Adding translated content blocks...")
+    for block, translated_text in zip(source_blocks, translations[1:]):
+        article_info['content'].append(dict(block, text=translated_text, is_gujarati=True))
+        article_info['content'].append(dict(block, is_gujarati=False))
+        print(f"  • Added {block['type']}: {block['text'][:50]}...")
+    
+    print(f"  ✓ Processed {len(article_info['content'])} content blocks")
+    
+    # Print a summary of content types
+    content_types = {}
+    for block in article_info['content']:
+        block_type = block.get('type', 'unknown')
+        content_types[block_type] = content_types.get(block_type, 0) + 1
+    
+    print("\nContent summary:")
+    for content_type, count in content_types.items():
+        print(f"  • {content_type}: {count} blocks")
+    
+    return article_info
+
+async def scrape_and_get_content(url, session=None):
+    """
+    Scrape article content and process it for PDF generation.
+    
+    Args:
+        url: URL of the article
+        session: Optional shared aiohttp session (a new one is created if omitted)
+    
+    Returns:
+        dict: Article information, or None if the article could not be processed
+    """
+    if session is None:
+        async with create_session(1) as own_session:
+            return await scrape_and_get_content(url, own_session)
+    
     start_time = datetime.now()
     print(f"\n{'='*50}")
     print(f"PROCESSING ARTICLE: {url}")
@@ -257,9 +787,8 @@ async def scrape_and_get_content(url):
     
     try:
         print("• Fetching article content...")
-        response = requests.get(url, timeout=20)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        content = await fetch_url(session, url, 'article')
+        soup = parse_html(content, scope='article')
         
         # Find the main content area with the new structure
         print("• Locating main content...")
@@ -292,250 +821,52 @@ async def scrape_and_get_content(url):
             else:
                 print("  ✗ No featured image found")
         
-        # Process image if found
-        image_data = None
-        if image_url:
-            print("• Processing image...")
-            image_data = download_and_convert_image(image_url)
-            if image_data:
-                print("  ✓ Image processed successfully")
-            else:
-                print("  ✗ Failed to process image")
-        
         heading_text = heading.get_text().strip()
         print(f"• Article title: {heading_text}")
         
-        print("• Translating title to Gujarati...")
-        translated_heading = translate_to_gujarati(heading_text)
-        print("  ✓ Translation complete")
-        
-        # Add the article header information
-        article_info = {
-            'gujarati_title': translated_heading,
-            'english_title': heading_text,
-            'image': image_data,
-            'content': []
-        }
-        
-        # Find and remove specific sections to exclude from scraping
-        print("• Cleaning up article content...")
-        # 1. Remove ShareThis buttons
-        share_buttons = main_content.find_all('div', class_='sharethis-inline-share-buttons')
-        for div in share_buttons:
-            div.decompose()
-        
-        # 2. Remove related articles section
-        related_articles = main_content.find_all('div', class_='related-articles')
-        for div in related_articles:
-            div.decompose()
-        
-        # 3. Remove comments section
-        comments_section = main_content.find(id='comments')
-        if comments_section:
-            comments_section.decompose()
-        
-        # Additional comment sections that might be present
-        respond_section = main_content.find(id='respond')
-        if respond_section:
-            respond_section.decompose()
-            
-        # Remove post-meta sections
-        post_meta_sections = main_content.find_all('div', class_='post-meta')
-        for section in post_meta_sections:
-            section.decompose()
-            
-        # Remove breadcrumb sections
-        breadcrumb_sections = main_content.find_all('div', class_='breadcrumb')
-        for section in breadcrumb_sections:
-            section.decompose()
-        
-        # Process only the content elements (paragraphs, headings, lists)
-        # Skip breadcrumb, post-meta, comments and other non-content elements
+        # Walk the article once, skipping share buttons, related articles,
+        # comments, post meta and breadcrumbs, and collect typed content blocks
         print("• Extracting content elements...")
-        content_elements = []
+        source_blocks = extract_content_blocks(main_content)
+        print(f"  ✓ Found {len(source_blocks)} content blocks")
         
-        # First try to find the article-content div which contains the main content
-        article_content = main_content.find('div', class_='entry-content')
-        if not article_content:
-            article_content = main_content.find('div', class_='post-content')
-        if not article_content:
-            article_content = main_content
-            
-        # Find all content elements within the article content
-        for tag in article_content.find_all(['p', 'h2', 'h4', 'ul', 'ol']):
-            # Skip elements inside unwanted sections
-            should_skip = False
-            
-            # Check if parent or grandparent has any of these classes or IDs
-            parent = tag.parent
-            for _ in range(3):  # Check up to 3 levels up
-                if not parent:
-                    break
-                
-                # Skip if parent has any of these classes or IDs
-                if parent.get('class'):
-                    parent_classes = ' '.join(parent.get('class', []))
-                    if any(cls in parent_classes for cls in [
-                        'sharethis', 'related-articles', 'comments', 'comment-respond',
-                        'post-meta', 'breadcrumb'
-                    ]):
-                        should_skip = True
-                        break
-                
-                # Skip by ID
-                parent_id = parent.get('id', '')
-                if any(id_name in parent_id for id_name in ['comments', 'respond']):
-                    should_skip = True
-                    break
-                
-                parent = parent.parent
-            
-            if should_skip:
-                continue
-                
-            # Skip empty elements or those with very little content
-            text = tag.get_text().strip()
-            if not text or len(text) < 10:
-                continue
-                
-            content_elements.append(tag)
-        
-        print(f"  ✓ Found {len(content_elements)} content elements")
-        
-        # If no content elements were found, try a more aggressive approach
-        if len(content_elements) == 0:
-            print("  ⚠️ No content elements found with standard approach, trying alternative methods...")
-            
-            # Method 1: Try to find any paragraphs directly in the main content
-            all_paragraphs = main_content.find_all('p')
-            if all_paragraphs:
-                print(f"  • Found {len(all_paragraphs)} paragraphs with direct search")
-                content_elements = [p for p in all_paragraphs if len(p.get_text().strip()) > 20]
-                print(f"  • Added {len(content_elements)} meaningful paragraphs")
-            
-            # Method 2: If still no content, look for divs with substantial text
-            if len(content_elements) == 0:
-                print("  • Looking for divs with substantial text...")
-                for div in main_content.find_all('div'):
-                    if div.find_all(['p', 'h2', 'h4', 'ul', 'ol']):
-                        # Skip if this div is likely a container
-                        continue
-                    
-                    text = div.get_text().strip()
-                    if len(text) > 100:  # Only divs with substantial text
-                        content_elements.append(div)
-                        print(f"  • Added div with {len(text)} characters of text")
-        
-        print(f"  ✓ Final content elements count: {len(content_elements)}")
-        
-        # Debug: Print a sample of the content elements
-        if content_elements:
-            print("\nSample of content elements found:")
-            for i, elem in enumerate(content_elements[:3]):  # Show first 3 elements
-                text = elem.get_text().strip()
-                print(f"  Element {i+1} ({elem.name}): {text[:50]}...")
+        # Debug: Print a sample of the content blocks
+        if source_blocks:
+            print("\nSample of content blocks found:")
+            for i, block in enumerate(source_blocks[:3]):  # Show first 3 blocks
+                print(f"  Block {i+1} ({block['type']}): {block['text'][:50]}...")
         else:
-            print("\n⚠️ WARNING: No content elements found!")
-        
-        print("• Processing and translating content...")
-        numbered_list_counter = 1
-        
-        # Debug: Print article info structure before adding content
-        print(f"\nArticle info before adding content:")
-        print(f"  • Title: {article_info['english_title']}")
-        print(f"  • Image: {'Present' if article_info['image'] else 'None'}")
-        print(f"  • Content blocks: {len(article_info['content'])}")
-
-        for tag in content_elements:
-            text = tag.get_text().strip()
-            if not text:
-                continue
-            
-            # Skip post-meta and breadcrumb content that might be missed
-            if ('post-date' in text.lower() or 'post-categories' in text.lower() or
-                'breadcrumb' in text.lower() or 'itemscope' in text.lower() or
-                'schema.org' in text.lower() or 'fa fa-calendar' in text.lower() or
-                'fa fa-folder' in text.lower()):
-                continue
-            
-            translated_text = translate_to_gujarati(text)
-            
-            if tag.name == 'p':
-                article_info['content'].append({'type': 'paragraph', 'text': translated_text, 'is_gujarati': True})
-                article_info['content'].append({'type': 'paragraph', 'text': text, 'is_gujarati': False})
-                print(f"  • Added paragraph: {text[:50]}...")
-            elif tag.name == 'h2':
-                article_info['content'].append({'type': 'heading_2', 'text': translated_text, 'is_gujarati': True})
-                article_info['content'].append({'type': 'heading_2', 'text': text, 'is_gujarati': False})
-                print(f"  • Added heading: {text}")
-            elif tag.name == 'h4':
-                article_info['content'].append({'type': 'heading_4', 'text': translated_text, 'is_gujarati': True})
-                article_info['content'].append({'type': 'heading_4', 'text': text, 'is_gujarati': False})
-                print(f"  • Added subheading: {text}")
-            elif tag.name == 'ul':
-                for li in tag.find_all('li'):
-                    li_text = li.get_text().strip()
-                    translated_li_text = translate_to_gujarati(li_text)
-                    article_info['content'].append({'type': 'bullet_list', 'text': translated_li_text, 'is_gujarati': True})
-                    article_info['content'].append({'type': 'bullet_list', 'text': li_text, 'is_gujarati': False})
-                    print(f"  • Added bullet point: {li_text[:50]}...")
-            elif tag.name == 'ol':
-                for li in tag.find_all('li'):
-                    li_text = li.get_text().strip()
-                    translated_li_text = translate_to_gujarati(li_text)
-                    article_info['content'].append({'type': 'numbered_list', 'text': translated_li_text, 'number': numbered_list_counter, 'is_gujarati': True})
-                    article_info['content'].append({'type': 'numbered_list', 'text': li_text, 'number': numbered_list_counter, 'is_gujarati': False})
-                    print(f"  • Added numbered point {numbered_list_counter}: {li_text[:50]}...")
-                    numbered_list_counter += 1
-        
-        print(f"  ✓ Processed {len(article_info['content'])} content blocks")
-        
-        # Debug: Check if content was actually extracted
-        if len(article_info['content']) == 0:
-            print("  ⚠️ WARNING: No content was extracted from this article!")
+            print("\n⚠️ WARNING: No content was extracted from this article!")
             print("  ⚠️ This may indicate a problem with the HTML structure or content selectors.")
-            
-            # Try a more aggressive approach to find content
-            print("  • Attempting more aggressive content extraction...")
-            all_paragraphs = main_content.find_all('p')
-            if all_paragraphs:
-                print(f"  • Found {len(all_paragraphs)} paragraphs with direct search")
-                for p in all_paragraphs[:3]:  # Just add the first few paragraphs as a fallback
-                    text = p.get_text().strip()
-                    if text and len(text) > 20:  # Only meaningful paragraphs
-                        translated_text = translate_to_gujarati(text)
-                        article_info['content'].append({'type': 'paragraph', 'text': translated_text, 'is_gujarati': True})
-                        article_info['content'].append({'type': 'paragraph', 'text': text, 'is_gujarati': False})
-                        print(f"  • Added fallback paragraph: {text[:50]}...")
+        
+        # Reuse the finished article if its source text has not changed since it was processed
+        source_hash = article_source_hash(heading_text, image_url, source_blocks)
+        if raw_archive.replay:
+            # Articles that came from the article cache were archived whole, see archive_cached_article
+            archived = raw_archive.get(article_info_key(url, source_hash))
+            article_info = json.loads(archived.decode('utf-8')) if archived else None
         else:
-            # Print a summary of content types
-            content_types = {}
-            for block in article_info['content']:
-                block_type = block.get('type', 'unknown')
-                if block_type in content_types:
-                    content_types[block_type] += 1
-                else:
-                    content_types[block_type] = 1
-            
-            print("\nContent summary:")
-            for content_type, count in content_types.items():
-                print(f"  • {content_type}: {count} blocks")
-
-        # Connect to MongoDB and save the URL as scraped
-        print("• Saving URL to MongoDB...")
-        client, collection = get_mongodb_connection()
-        if client is not None and collection is not None:
-            try:
-                # Store URL to MongoDB after processing
-                save_scraped_url(collection, url)
-                print(f"  ✓ Successfully saved URL to MongoDB: {url}")
-            except Exception as e:
-                print(f"  ✗ Error saving URL to MongoDB: {str(e)}")
-            finally:
-                client.close()
-                print("  • MongoDB connection closed")
+            article_info = await asyncio.to_thread(article_cache.get, url, source_hash)
+        if article_info:
+            print("  ✓ Article unchanged since it was last processed, using cached translation")
+            if not image_store.contains(article_info['image']):
+                # The processed image was evicted from the image store since the article was cached
+                print("• Re-processing evicted image...")
+                article_info['image'] = await download_and_convert_image(session, image_url)
+                if article_info['image'] and not raw_archive.replay:
+                    await asyncio.to_thread(article_cache.put, url, source_hash, article_info)
+            if not raw_archive.replay:
+                await asyncio.to_thread(archive_cached_article, url, source_hash, image_url, article_info)
         else:
-            print("  ✗ Failed to connect to MongoDB, URL not saved")
+            article_info = await build_article_info(session, heading_text, image_url, source_blocks)
+            # Don't cache an article whose image failed so the image is retried next time
+            if not raw_archive.replay and (article_info['image'] or not image_url):
+                await asyncio.to_thread(article_cache.put, url, source_hash, article_info)
+        
+        # Queue the URL as scraped; it is written to the registry once the edition is published
+        if not raw_archive.replay:
+            print(f"• Queueing URL for {url_registry.label}...")
+            await scraped_url_writer.add_async(url)
         
         # Calculate processing time
         end_time = datetime.now()
@@ -550,8 +881,47 @@ async def scrape_and_get_content(url):
         print(f"{'='*50}")
         return None
 
-async def get_all_articles(urls, max_articles=None):
-    """Process multiple articles and return their structured content."""
+async def process_article(session, semaphore, index, total, url, timeout=ARTICLE_TIMEOUT):
+    """
+    Scrape one article while holding a worker slot, with a per-article timeout.
+    
+    Args:
+        session: Shared aiohttp session
+        semaphore: asyncio.Semaphore limiting the number of articles in flight
+        index: Position of the article in the URL list (1-based)
+        total: Number of URLs being processed
+        url: URL of the article
+        timeout: Seconds allowed for the whole article
+    
+    Returns:
+        dict: Article information, or None on failure
+    """
+    async with semaphore:
+        print(f"\nProcessing article {index}/{total}: {url}")
+        try:
+            article_data = await asyncio.wait_for(scrape_and_get_content(url, session), timeout)
+        except asyncio.TimeoutError:
+            print(f"✗ Article {index} timed out after {timeout} seconds: {url}")
+            return None
+        
+        if article_data:
+            print(f"✓ Article {index} processed successfully: {article_data['english_title']}")
+        else:
+            print(f"✗ Failed to process article {index}: {url}")
+        return article_data
+
+async def get_all_articles(urls, max_articles=None, concurrency=ARTICLE_CONCURRENCY):
+    """
+    Process multiple articles concurrently and return their structured content.
+    
+    Args:
+        urls: List of article URLs
+        max_articles: Optional maximum number of articles to process
+        concurrency: Number of articles processed at the same time
+    
+    Returns:
+        tuple: (articles, titles) in the original URL order
+    """
     start_time = datetime.now()
     print(f"\n{'='*80}")
     print(f"STARTING ARTICLE PROCESSING ({start_time.strftime('%H:%M:%S')})")
@@ -563,17 +933,20 @@ async def get_all_articles(urls, max_articles=None):
     # Process all URLs (no random selection)
     # If max_articles is specified, limit to that number
     urls_to_process = urls if not max_articles else urls[:max_articles]
-    print(f"Total URLs to process: {len(urls_to_process)}")
+    print(f"Total URLs to process: {len(urls_to_process)} ({concurrency} at a time)")
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    async with create_session(concurrency * 2) as session:
+        # gather() returns results in the order the URLs were given
+        results = await asyncio.gather(*(
+            process_article(session, semaphore, i, len(urls_to_process), url)
+            for i, url in enumerate(urls_to_process, 1)
+        ))
     
-    for i, url in enumerate(urls_to_process, 1):
-        print(f"\nProcessing article {i}/{len(urls_to_process)}: {url}")
-        article_data = await scrape_and_get_content(url)
+    for article_data in results:
         if article_data:
             articles.append(article_data)
             titles.append(article_data['english_title'])
-            print(f"✓ Article {i} processed successfully: {article_data['english_title']}")
-        else:
-            print(f"✗ Failed to process article {i}: {url}")
     
     # Calculate processing time
     end_time = datetime.now()
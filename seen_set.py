@@ -0,0 +1,212 @@
+import os
+import json
+import math
+import time
+import struct
+import hashlib
+from datetime import datetime
+from config import (SEEN_SET_ENABLED, SEEN_SET_PATH, SEEN_SET_CAPACITY, SEEN_SET_ERROR_RATE,
+                    SEEN_SET_RECENT_DAYS)
+
+SNAPSHOT_MAGIC = b'SEENSET1'
+
+class BloomFilter:
+    """
+    Bloom filter over strings in a bytearray, using double hashing of one
+    BLAKE2b digest. Sized for `capacity` items at `error_rate` false positives.
+    """
+
+    def __init__(self, capacity, error_rate, bits=None, hashes=None, count=0, data=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = bits or max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = hashes or max(1, round(self.bits / capacity * math.log(2)))
+        self.count = count
+        self.data = data if data is not None else bytearray((self.bits + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item; returns True if it was not (probably) present before."""
+        added = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.data[byte] & (1 << bit):
+                self.data[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item):
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self.data[byte] & (1 << bit):
+                return False
+        return True
+
+class SeenUrlSet:
+    """
+    Local snapshot of the scraped URL registry used to decide which listing URLs
+    are new without asking the database about every one of them.
+
+    A Bloom filter holds every scraped URL and an exact dict holds the URLs scraped
+    in the last recent_days days. A URL missing from the filter is definitely new;
+    a recent URL is definitely scraped; any other filter hit is only possibly
+    scraped and is confirmed against the registry. While it is unreachable, possible
+    hits count as scraped (at worst error_rate of the new URLs are skipped).
+
+    The snapshot is synced incrementally from the scraped_at field of the records
+    (only documents at or after the last watermark are read) and saved to one file.
+    """
+
+    def __init__(self, path=SEEN_SET_PATH, capacity=SEEN_SET_CAPACITY, error_rate=SEEN_SET_ERROR_RATE,
+                 recent_days=SEEN_SET_RECENT_DAYS, enabled=SEEN_SET_ENABLED):
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_age = recent_days * 24 * 3600
+        self.enabled = enabled
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.recent = {}
+        self.watermark = None
+        self.stats = {'synced': 0, 'new': 0, 'recent': 0, 'possible': 0, 'loaded': False}
+
+    @property
+    def ready(self):
+        """True once the snapshot has been synced with the registry at least once."""
+        return self.enabled and self.watermark is not None
+
+    def load(self):
+        """Load the snapshot file, if there is one."""
+        if not self.enabled:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    raise ValueError("not a seen-set snapshot")
+                header_size, = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(header_size).decode('utf-8'))
+                data = bytearray(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, struct.error) as e:
+            print(f"  ✗ Could not read the seen-URL snapshot, it will be rebuilt: {str(e)}")
+            return
+
+        self.bloom = BloomFilter(header['capacity'], header['error_rate'], header['bits'],
+                                 header['hashes'], header['count'], data)
+        self.recent = header['recent']
+        self.watermark = datetime.fromisoformat(header['watermark']) if header['watermark'] else None
+        self.stats['loaded'] = True
+
+    def save(self):
+        """Write the snapshot file, dropping recent URLs older than the window."""
+        if not self.enabled:
+            return
+        cutoff = time.time() - self.recent_age
+        self.recent = {url: scraped_at for url, scraped_at in self.recent.items() if scraped_at >= cutoff}
+        header = json.dumps({
+            'capacity': self.bloom.capacity,
+            'error_rate': self.bloom.error_rate,
+            'bits': self.bloom.bits,
+            'hashes': self.bloom.hashes,
+            'count': self.bloom.count,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'recent': self.recent,
+        }).encode('utf-8')
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                f.write(struct.pack('<I', len(header)))
+                f.write(header)
+                f.write(self.bloom.data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"  ✗ Could not save the seen-URL snapshot: {str(e)}")
+
+    def add(self, url, scraped_at=None):
+        """Record a URL as scraped (scraped_at is a datetime, defaulting to now)."""
+        if not self.enabled:
+            return
+        self.bloom.add(url)
+        timestamp = scraped_at.timestamp() if scraped_at else time.time()
+        if timestamp >= time.time() - self.recent_age:
+            self.recent[url] = max(timestamp, self.recent.get(url, 0))
+
+    def sync(self, registry):
+        """
+        Add the records scraped since the last sync to the snapshot.
+        The filter is rebuilt at twice the capacity from a full scan once it
+        holds more URLs than it was sized for.
+
+        Args:
+            registry: Scraped URL registry (db_utils.UrlRegistry)
+
+        Returns:
+            int: Number of records read
+        """
+        if not self.enabled:
+            return 0
+        if self.bloom.count > self.bloom.capacity:
+            print(f"  • Seen-URL filter is full ({self.bloom.count} URLs), rebuilding it")
+            self.bloom = BloomFilter(max(self.capacity, self.bloom.capacity * 2), self.error_rate)
+            self.recent = {}
+            self.watermark = None
+
+        # Records written at the watermark itself are read again; adding them twice is harmless
+        cursor = registry.scraped_since(self.watermark)
+        watermark = self.watermark
+        read = 0
+        for doc in cursor:
+            scraped_at = doc.get("scraped_at")
+            self.add(doc["url"], scraped_at)
+            if scraped_at and (watermark is None or scraped_at > watermark):
+                watermark = scraped_at
+            read += 1
+        # An empty registry still counts as synced
+        self.watermark = watermark or datetime.min
+        self.stats['synced'] += read
+        return read
+
+    def partition(self, urls):
+        """
+        Split URLs by what the snapshot knows about them.
+
+        Returns:
+            tuple: (definitely new URLs, definitely scraped URLs, URLs that must be
+                    confirmed against the registry); everything needs confirming until
+                    the snapshot has been synced once
+        """
+        if not self.ready:
+            return [], [], list(urls)
+        new, seen, possible = [], [], []
+        for url in urls:
+            if url in self.recent:
+                seen.append(url)
+            elif url in self.bloom:
+                possible.append(url)
+            else:
+                new.append(url)
+        self.stats['new'] += len(new)
+        self.stats['recent'] += len(seen)
+        self.stats['possible'] += len(possible)
+        return new, seen, possible
+
+    def report(self):
+        """Print how many lookups the snapshot answered locally."""
+        if not self.ready:
+            return
+        answered = self.stats['new'] + self.stats['recent']
+        print("Seen-URL snapshot statistics:")
+        print(f"  • URLs in filter: {self.bloom.count} (capacity {self.bloom.capacity}), "
+              f"recent: {len(self.recent)}, synced this run: {self.stats['synced']}")
+        print(f"  • Answered locally: {answered} ({self.stats['new']} new, {self.stats['recent']} recent), "
+              f"confirmed with the registry: {self.stats['possible']}")
+
+# Shared snapshot used by the whole run
+seen_urls = SeenUrlSet()
@@ -1,45 +1,368 @@
-from deep_translator import GoogleTranslator
-import time
-import random
+import asyncio
+import re
+from archive import raw_archive, translation_key
+from host_governor import get_governor
+from translation_memory import translation_memory, segment_key
+from translation_backends import get_backend, BatchMisaligned, SEGMENT_DELIMITER, DELIMITER_PATTERN
+from translation_planner import TranslationPlan, planner_stats
+from config import TRANSLATION_WORKERS
 
-def translate_to_gujarati(text):
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Backend used for all translations in this process (TRANSLATION_BACKEND in config.py)
+backend = get_backend()
+
+def split_text(text, limit=None):
+    """
+    Split text into chunks of at most limit characters on sentence boundaries.
+    Sentences longer than the limit are split between words.
+    
+    Args:
+        text: Text to split
+        limit: Maximum characters per chunk (defaults to the backend's limit)
+    
+    Returns:
+        list: Text chunks
+    """
+    limit = limit or backend.char_limit
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        while len(sentence) > limit:
+            cut = sentence.rfind(' ', 0, limit)
+            if cut <= 0:
+                cut = limit  # A single "word" longer than the limit
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+    
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def pack_segments(segments, limit=None, max_segments=None):
+    """
+    Group segment indexes into batches that fit in one request.
+    
+    Args:
+        segments: List of English segments
+        limit: Maximum characters per request (defaults to the backend's limit)
+        max_segments: Maximum segments per request (defaults to the backend's limit)
+    
+    Returns:
+        tuple: (list of batches of indexes, list of indexes to translate on their own)
+    """
+    limit = limit or backend.char_limit
+    max_segments = max_segments or backend.max_segments
+    separator = len(SEGMENT_DELIMITER)
+    batches = []
+    alone = []
+    current = []
+    size = 0
+    for index, segment in enumerate(segments):
+        if not segment.strip():
+            continue
+        # Oversized segments are split into chunks, and a segment containing
+        # the delimiter itself would break realignment
+        if len(segment) > limit or DELIMITER_PATTERN.search(segment):
+            alone.append(index)
+            continue
+        added = len(segment) + (separator if current else 0)
+        if current and (size + added > limit or len(current) == max_segments):
+            batches.append(current)
+            current = []
+            added = len(segment)
+            size = 0
+        current.append(index)
+        size += added
+    if current:
+        batches.append(current)
+    return batches, alone
+
+def count_requests(segments):
+    """Number of requests translate_segments_async would send for a list of segments."""
+    batches, alone = pack_segments(segments)
+    return len(batches) + len(alone)
+
+class TranslationService:
+    """
+    Async translation service: a queue of translation requests served by a fixed
+    pool of worker tasks.
+    
+    Requests are rate limited by the backend host's governor from the event loop,
+    and only the blocking backend call itself runs in a thread (the backends keep
+    one translator instance or HTTP session per thread), so waits and backoff never
+    stall the event loop. submit() and submit_batch() return futures.
     """
-    Translate English text to Gujarati using deep_translator library.
-    Includes retry mechanism and rate limiting to avoid API issues.
+    
+    def __init__(self, translation_backend=None, workers=TRANSLATION_WORKERS, max_retries=3):
+        self.backend = translation_backend or backend
+        self.worker_count = workers
+        self.max_retries = max_retries
+        self._loop = None
+        self._queue = None
+        self._workers = []
+    
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new event loop (the old workers died with the old loop)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._workers = [loop.create_task(self._worker()) for _ in range(self.worker_count)]
+    
+    def submit(self, text):
+        """
+        Queue one text that fits in a single request.
+        
+        Returns:
+            asyncio.Future: Resolves to the translated text, or to the last error
+                            once all retries have failed
+        """
+        return self._enqueue(self.backend.translate, text)
+    
+    def submit_batch(self, texts):
+        """
+        Queue several segments to be translated in one request.
+        
+        Returns:
+            asyncio.Future: Resolves to the list of translations, or to an error
+                            (BatchMisaligned if the result could not be realigned)
+        """
+        return self._enqueue(self.backend.translate_batch, texts)
+    
+    def _enqueue(self, func, payload):
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((func, payload, future))
+        return future
+    
+    async def _worker(self):
+        while True:
+            func, payload, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                try:
+                    result = await self._request(func, payload)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self._queue.task_done()
+    
+    async def _request(self, func, payload):
+        governor = get_governor(self.backend.host, self.backend.limits)
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with governor.request() as outcome:
+                    try:
+                        return await asyncio.to_thread(func, payload)
+                    except BatchMisaligned:
+                        # The request itself succeeded, so the host is not throttled
+                        outcome['status'] = 200
+                        raise
+                    except Exception as e:
+                        outcome['status'] = getattr(e, 'status', None)
+                        outcome['retry_after'] = getattr(e, 'retry_after', None)
+                        raise
+            except BatchMisaligned:
+                raise
+            except Exception as e:
+                print(f"Translation error (attempt {attempt}/{self.max_retries}): {str(e)}")
+                if attempt == self.max_retries:
+                    raise
+    
+    async def close(self):
+        """Stop the worker tasks."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        self._queue = None
+
+# Shared translation service used by the whole run
+translation_service = TranslationService()
+
+async def translate_text_async(text, service=None):
+    """
+    Translate one text of any length through the translation service.
+    Long texts are split on sentence boundaries and their chunks translated in parallel.
+    
+    Returns:
+        str: Translated text, or the original text if translation failed
     """
     if not text or len(text.strip()) == 0:
         return ""
     
-    # Maximum retry attempts
-    max_retries = 3
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            # Add rate limiting with random delay to avoid hitting API limits
-            delay = 1.0 + random.random()  # Random delay between 1.0 and 2.0 seconds
-            time.sleep(delay)
-            
-            # Create a new translator instance for each request
-            translator = GoogleTranslator(source='en', target='gu')
-            
-            # Break large text into chunks if needed (API limit is ~5000 chars)
-            if len(text) > 4000:
-                chunks = [text[i:i+4000] for i in range(0, len(text), 4000)]
-                translated_chunks = []
-                for chunk in chunks:
-                    time.sleep(delay)  # Add delay between chunks
-                    translated_chunks.append(translator.translate(chunk))
-                return ' '.join(translated_chunks)
-            else:
-                # Translate normal text
-                return translator.translate(text)
-            
-        except Exception as e:
-            retry_count += 1
-            print(f"Translation error (attempt {retry_count}/{max_retries}): {str(e)}")
-            time.sleep(2 * retry_count)  # Exponential backoff
-    
-    # If all retries fail, return original text
-    print(f"Failed to translate after {max_retries} attempts: {text[:50]}...")
-    return text 
\ No newline at end of file
+    service = service or translation_service
+    limit = service.backend.char_limit
+    chunks = split_text(text, limit) if len(text) > limit else [text]
+    results = await asyncio.gather(*(service.submit(chunk) for chunk in chunks),
+                                   return_exceptions=True)
+    if any(isinstance(result, Exception) for result in results):
+        print(f"Failed to translate after {service.max_retries} attempts: {text[:50]}...")
+        return text
+    return ' '.join(results)
+
+async def translate_packed_async(texts, service=None):
+    """
+    Translate several segments in one request through the translation service.
+    
+    Returns:
+        list: Translations in the same order, or None if the request failed or
+              the result could not be realigned
+    """
+    service = service or translation_service
+    if len(texts) == 1:
+        return [await translate_text_async(texts[0], service)]
+    
+    try:
+        return await service.submit_batch(texts)
+    except BatchMisaligned as e:
+        print(f"  ✗ {str(e)}, translating one by one")
+        return None
+    except Exception:
+        return None
+
+async def translate_segments_async(segments, service=None):
+    """
+    Translate a list of English segments with as few requests as possible.
+    
+    Segments are packed into requests of up to the backend's character limit and
+    split back into segments by the backend; all packed requests of the list are
+    queued at once and served in parallel by the translation service's workers.
+    If a batch fails or comes back with a different number of segments, its
+    segments are translated one by one instead.
+    
+    Args:
+        segments: List of English texts
+        service: TranslationService to use (defaults to the shared service)
+    
+    Returns:
+        list: Gujarati translations in the same order
+    """
+    service = service or translation_service
+    results = ['' if not segment.strip() else None for segment in segments]
+    batches, alone = pack_segments(segments, service.backend.char_limit, service.backend.max_segments)
+    
+    packed = await asyncio.gather(*(translate_packed_async([segments[index] for index in batch], service)
+                                    for batch in batches))
+    for batch, translated in zip(batches, packed):
+        if translated is None:
+            translated = await asyncio.gather(*(translate_text_async(segments[index], service)
+                                                for index in batch))
+        for index, text in zip(batch, translated):
+            results[index] = text
+    
+    single = await asyncio.gather(*(translate_text_async(segments[index], service) for index in alone))
+    for index, text in zip(alone, single):
+        results[index] = text
+    
+    return results
+
+async def translate_to_gujarati_async(text):
+    """
+    Translate English text to Gujarati without blocking the event loop.
+    The request goes through the shared translation service.
+    """
+    key = translation_key(text)
+    if raw_archive.replay:
+        archived = raw_archive.get(key)
+        if archived is None:
+            print(f"Translation not in archive, keeping original text: {text[:50]}...")
+            return text
+        return archived.decode('utf-8')
+    
+    translated = await translate_text_async(text)
+    await asyncio.to_thread(raw_archive.record, key, translated.encode('utf-8'), 'translation')
+    return translated
+
+async def translate_batch_async(segments):
+    """
+    Translate a list of segments without blocking the event loop.
+    
+    Segments found in the translation memory are not sent again, and a segment
+    repeated within the list is translated only once. Each segment is archived
+    separately, so replays work for single and batched translations.
+    
+    Args:
+        segments: List of English texts
+    
+    Returns:
+        list: Gujarati translations in the same order
+    """
+    if raw_archive.replay:
+        return [await translate_to_gujarati_async(segment) for segment in segments]
+    
+    keys = [segment_key(segment) if segment.strip() else None for segment in segments]
+    known = await asyncio.to_thread(translation_memory.get_many, [s for s in segments if s.strip()])
+    
+    # One request slot per distinct untranslated segment
+    pending = {}
+    for segment, key in zip(segments, keys):
+        if key is None:
+            continue
+        if key in known:
+            translation_memory.stats['hits'] += 1
+        elif key in pending:
+            translation_memory.stats['deduplicated'] += 1
+        else:
+            translation_memory.stats['misses'] += 1
+            pending[key] = segment
+    
+    if pending:
+        translated = await translate_segments_async(list(pending.values()))
+        new_translations = dict(zip(pending, translated))
+        known.update(new_translations)
+        # Segments that fell back to the English text are not remembered, so they are retried next time
+        await asyncio.to_thread(translation_memory.put_many, [
+            (pending[key], text) for key, text in new_translations.items() if text and text != pending[key]
+        ])
+    
+    results = [known[key] if key else '' for key in keys]
+    await asyncio.to_thread(raw_archive.record_many, [
+        (translation_key(segment), text.encode('utf-8')) for segment, text in zip(segments, results)
+    ], 'translation')
+    return results
+
+async def translate_planned_async(segments):
+    """
+    Plan and translate a list of segments.
+    
+    Segments without translatable text are passed through unchanged, and numbers,
+    URLs and acronyms are replaced with placeholders before translation and
+    restored afterwards. Segments whose placeholders did not survive translation
+    are translated again without protection.
+    
+    Args:
+        segments: List of English texts
+    
+    Returns:
+        list: Gujarati translations in the same order
+    """
+    plan = TranslationPlan(segments)
+    indexes = plan.indexes_to_send()
+    request_texts = [plan.request_texts[index] for index in indexes]
+    planner_stats['requests_unplanned'] += count_requests(segments)
+    planner_stats['requests_planned'] += count_requests(request_texts)
+    
+    translated = await translate_batch_async(request_texts)
+    results, lost = plan.restore(dict(zip(indexes, translated)))
+    if lost:
+        retranslated = await translate_batch_async([segments[index] for index in lost])
+        for index, text in zip(lost, retranslated):
+            results[index] = text
+    return results
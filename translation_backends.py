@@ -0,0 +1,203 @@
+import re
+import time
+import threading
+import requests
+from urllib.parse import urlparse
+from deep_translator import GoogleTranslator
+from deep_translator.exceptions import TooManyRequests, RequestError
+from config import TRANSLATION_BACKEND, TRANSLATION_STUB_URL, REQUEST_TIMEOUT
+
+# Separator placed between segments packed into one request by backends without a
+# native batch call. Google keeps the pipes and line breaks intact, and the segment
+# count is checked after splitting.
+SEGMENT_DELIMITER = '\n|||\n'
+DELIMITER_PATTERN = re.compile(r'\s*\|\|\|\s*')
+
+class TranslationError(Exception):
+    """
+    A translation request failed.
+
+    Attributes:
+        status: HTTP status of the failed request (429 for rate limiting), or None
+        retry_after: Seconds the backend asked us to wait, or None
+    """
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class BatchMisaligned(TranslationError):
+    """A packed batch came back with a different number of segments."""
+
+class TranslationBackend:
+    """
+    Base class for translation providers.
+
+    A backend declares its request limits and implements translate() for one text;
+    translate_batch() packs several segments into one request with SEGMENT_DELIMITER
+    unless the backend has a native batch call. Hooks registered with add_hook()
+    are called with (backend, latency_seconds, segment_count) on 'latency' and
+    (backend, error) on 'error' for every request.
+
+    Attributes:
+        name: Backend name used in config and reports
+        host: Host name the requests go to (used for the host governor)
+        char_limit: Maximum characters per request
+        max_segments: Maximum segments per batch request (None for no limit)
+        limits: Default governor limits for the host (see HOST_LIMITS in config.py)
+    """
+
+    name = None
+    host = None
+    char_limit = 4500
+    max_segments = None
+    limits = {}
+
+    def __init__(self, source='en', target='gu'):
+        self.source = source
+        self.target = target
+        self.hooks = {'latency': [], 'error': []}
+
+    def add_hook(self, event, callback):
+        """Register a callback for 'latency' or 'error' events."""
+        self.hooks[event].append(callback)
+
+    def _emit(self, event, *args):
+        for callback in self.hooks[event]:
+            callback(self, *args)
+
+    def _call(self, func, segment_count):
+        """Run one request, timing it and reporting errors to the hooks."""
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            self._emit('error', e)
+            raise
+        self._emit('latency', time.perf_counter() - start, segment_count)
+        return result
+
+    def _translate_one(self, text):
+        raise NotImplementedError
+
+    def translate(self, text):
+        """
+        Translate one text of at most char_limit characters.
+
+        Raises:
+            TranslationError: If the request failed
+        """
+        return self._call(lambda: self._translate_one(text), 1)
+
+    def _translate_many(self, texts):
+        translated = self._translate_one(SEGMENT_DELIMITER.join(texts))
+        parts = DELIMITER_PATTERN.split(translated.strip())
+        if len(parts) != len(texts) or not all(part.strip() for part in parts):
+            raise BatchMisaligned(f"Batch of {len(texts)} segments came back as {len(parts)} parts")
+        return [part.strip() for part in parts]
+
+    def translate_batch(self, texts):
+        """
+        Translate several segments in one request.
+
+        Args:
+            texts: Segments whose total size fits in char_limit
+
+        Returns:
+            list: Translations in the same order
+
+        Raises:
+            BatchMisaligned: If the response could not be split back into segments
+            TranslationError: If the request failed
+        """
+        if len(texts) == 1:
+            return [self.translate(texts[0])]
+        return self._call(lambda: self._translate_many(texts), len(texts))
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate through deep_translator (one translator instance per thread)."""
+
+    name = 'google'
+    host = 'translate.google.com'
+    char_limit = 4500  # deep_translator rejects more than 5000
+
+    def __init__(self, source='en', target='gu'):
+        super().__init__(source, target)
+        self._local = threading.local()
+
+    def _translator(self):
+        if not hasattr(self._local, 'translator'):
+            self._local.translator = GoogleTranslator(source=self.source, target=self.target)
+        return self._local.translator
+
+    def _translate_one(self, text):
+        try:
+            return self._translator().translate(text)
+        except TooManyRequests as e:
+            raise TranslationError(str(e), status=429) from e
+        except RequestError as e:
+            raise TranslationError(str(e), status=503) from e
+
+class StubBackend(TranslationBackend):
+    """
+    Client for the local translation stub server (translation_stub.py), which has a
+    native batch call. Used to measure and tune throughput offline.
+    """
+
+    name = 'stub'
+    char_limit = 4500
+    max_segments = 128
+    limits = {'rate': 50, 'burst': 50, 'max_window': 16, 'target_latency': 1.0}
+
+    def __init__(self, source='en', target='gu', url=TRANSLATION_STUB_URL):
+        super().__init__(source, target)
+        self.url = url.rstrip('/')
+        self.host = urlparse(self.url).hostname
+        self._local = threading.local()
+
+    def _session(self):
+        # One keep-alive session per thread
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _post(self, texts):
+        response = self._session().post(f"{self.url}/translate",
+                                        json={'source': self.source, 'target': self.target, 'q': texts},
+                                        timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            retry_after = response.headers.get('Retry-After')
+            raise TranslationError(f"Stub server answered {response.status_code}",
+                                   status=response.status_code,
+                                   retry_after=float(retry_after) if retry_after else None)
+        return response.json()['translations']
+
+    def _translate_one(self, text):
+        return self._post([text])[0]
+
+    def _translate_many(self, texts):
+        translations = self._post(texts)
+        if len(translations) != len(texts):
+            raise BatchMisaligned(f"Batch of {len(texts)} segments came back as {len(translations)} parts")
+        return translations
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    StubBackend.name: StubBackend,
+}
+
+def get_backend(name=TRANSLATION_BACKEND, **kwargs):
+    """
+    Create a translation backend by name.
+
+    Args:
+        name: "google" or "stub"
+        **kwargs: Passed to the backend constructor
+
+    Returns:
+        TranslationBackend
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
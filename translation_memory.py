@@ -0,0 +1,206 @@
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from remote_cache import remote_cache
+from config import (TRANSLATION_MEMORY_ENABLED, TRANSLATION_MEMORY_PATH, TRANSLATION_MEMORY_MAX_ENTRIES,
+                    REMOTE_CACHE_PREFETCH)
+
+WHITESPACE = re.compile(r'\s+')
+
+# Typographic characters that do not change a translation
+NORMALIZE_CHARS = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"',
+                                 '–': '-', '—': '-', '\u00a0': ' '})
+
+def normalize_segment(text):
+    """Normalise an English segment so trivially different copies share one entry."""
+    return WHITESPACE.sub(' ', text.translate(NORMALIZE_CHARS)).strip()
+
+def segment_key(text, source='en', target='gu'):
+    """Translation memory key: SHA-256 of the language pair and the normalised text."""
+    normalized = normalize_segment(text)
+    return hashlib.sha256(f"{source}:{target}:{normalized}".encode('utf-8')).hexdigest()
+
+class TranslationMemory:
+    """
+    Persistent segment-level translation memory in a local SQLite database.
+
+    Stores one row per normalised English segment and language pair, with its
+    translation, hit count and last use time. Least recently used rows are
+    removed by prune() once the table holds more than max_entries rows. Segments
+    missing locally are looked up in the MongoDB cache tier (remote_cache).
+    """
+
+    def __init__(self, path=TRANSLATION_MEMORY_PATH, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES,
+                 enabled=TRANSLATION_MEMORY_ENABLED, remote=remote_cache):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.remote = remote
+        self._connection = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'deduplicated': 0, 'stored': 0, 'evicted': 0, 'remote_hits': 0}
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    source_text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        return self._connection
+
+    def get_many(self, segments, source='en', target='gu'):
+        """
+        Look up translations for a list of segments.
+
+        Args:
+            segments: English segments
+            source: Source language code
+            target: Target language code
+
+        Returns:
+            dict: segment key -> translation for the segments found
+        """
+        if not self.enabled:
+            return {}
+        keys = list({segment_key(segment, source, target) for segment in segments})
+        found = {}
+        try:
+            with self._lock:
+                connection = self._connect()
+                # Stay well below SQLite's limit on query parameters
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    rows = connection.execute(
+                        f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk)
+                    found.update(rows.fetchall())
+                if found:
+                    connection.executemany(
+                        "UPDATE translations SET hits = hits + 1, last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key in found])
+                    connection.commit()
+        except sqlite3.Error as e:
+            print(f"  ✗ Translation memory lookup failed: {str(e)}")
+            return {}
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            records = self.remote.get_many('translation', missing)
+            if records:
+                self._insert([(key, record) for key, record in records.items()], replace=True)
+                found.update((key, record['translation']) for key, record in records.items())
+                self.stats['remote_hits'] += len(records)
+        return found
+
+    def _insert(self, records, replace):
+        """Store (key, record dict) pairs coming from the MongoDB cache tier."""
+        now = time.time()
+        rows = [(key, record['source_lang'], record['target_lang'], record['source_text'],
+                 record['translation'], now) for key, record in records]
+        try:
+            with self._lock:
+                connection = self._connect()
+                cursor = connection.executemany(f"""
+                    INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO translations
+                        (key, source_lang, target_lang, source_text, translation, hits, last_used)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                """, rows)
+                connection.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"  ✗ Could not store translations in the translation memory: {str(e)}")
+            return 0
+
+    def put_many(self, pairs, source='en', target='gu'):
+        """
+        Store translated segments.
+
+        Args:
+            pairs: List of (English segment, translation) tuples
+            source: Source language code
+            target: Target language code
+        """
+        if not self.enabled or not pairs:
+            return
+        now = time.time()
+        rows = [(segment_key(text, source, target), source, target, text, translation, now)
+                for text, translation in pairs]
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.executemany("""
+                    INSERT OR REPLACE INTO translations
+                        (key, source_lang, target_lang, source_text, translation, hits, last_used)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                """, rows)
+                connection.commit()
+            self.stats['stored'] += len(rows)
+        except sqlite3.Error as e:
+            print(f"  ✗ Could not store translations in the translation memory: {str(e)}")
+        for key, source_lang, target_lang, text, translation, _ in rows:
+            self.remote.put('translation', key, {'source_lang': source_lang, 'target_lang': target_lang,
+                                                 'source_text': text, 'translation': translation})
+
+    def prefetch(self, limit=REMOTE_CACHE_PREFETCH['translation']):
+        """Copy the most recently updated translations of the MongoDB cache tier to the local database."""
+        if not self.enabled:
+            return 0
+        records = self.remote.prefetch('translation', limit)
+        if not records:
+            return 0
+        return self._insert(records, replace=False)
+
+    def prune(self):
+        """Remove least recently used rows beyond max_entries."""
+        if not self.enabled:
+            return 0
+        try:
+            with self._lock:
+                connection = self._connect()
+                count = connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                excess = count - self.max_entries
+                if excess <= 0:
+                    return 0
+                connection.execute("""
+                    DELETE FROM translations WHERE key IN (
+                        SELECT key FROM translations ORDER BY last_used LIMIT ?
+                    )
+                """, (excess,))
+                connection.commit()
+            self.stats['evicted'] += excess
+            return excess
+        except sqlite3.Error as e:
+            print(f"  ✗ Translation memory eviction failed: {str(e)}")
+            return 0
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def report(self):
+        """Print the hit-rate counters for this run."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = self.stats['hits'] / lookups * 100 if lookups else 0
+        print("Translation memory statistics:")
+        print(f"  • Hits: {self.stats['hits']}, misses: {self.stats['misses']} ({hit_rate:.1f}% hit rate, "
+              f"{self.stats['remote_hits']} from the MongoDB cache tier)")
+        print(f"  • Repeated segments translated once in this run: {self.stats['deduplicated']}")
+        print(f"  • Stored: {self.stats['stored']}, evicted: {self.stats['evicted']}")
+
+# Shared translation memory used by the whole run
+translation_memory = TranslationMemory()
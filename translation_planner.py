@@ -0,0 +1,191 @@
+import re
+
+# Gujarati Unicode block
+GUJARATI_CHAR = re.compile(r'[\u0A80-\u0AFF]')
+LATIN_CHAR = re.compile(r'[A-Za-z]')
+
+URL = re.compile(r'(?:https?://|www\.)\S+?(?=[.,;:!?)]*(?:\s|$))|\b[\w.+-]+@[\w-]+\.[\w.]+\b')
+# 2024, 1,200, 3.5%, 2024-25, 12/05/2024, 10:30
+NUMBER = re.compile(r'(?<![\w\[])\d(?:[\d,./:-]*\d)?%?(?![\w\]])')
+# RBI, G20, COP28, R&D (at least two characters, starting with a capital)
+ACRONYM = re.compile(r'\b[A-Z](?:[A-Z0-9&]*[A-Z0-9])\b')
+MONTH = re.compile(r'\b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|'
+                   r'Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\b\.?')
+
+# Tokens protected from translation, matched in a single left-to-right pass
+PROTECTED = re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in (URL, NUMBER, ACRONYM)))
+PROTECTED_NO_ACRONYMS = re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in (URL, NUMBER)))
+
+# Placeholders put in place of protected tokens; Gujarati digits are accepted when restoring
+PLACEHOLDER = '[{}]'
+PLACEHOLDER_PATTERN = re.compile(r'\[([0-9\u0AE6-\u0AEF]+)\]')
+GUJARATI_DIGITS = str.maketrans('૦૧૨૩૪૫૬૭૮૯', '0123456789')
+
+TRANSLATE = 'translate'
+PASSTHROUGH = 'passthrough'
+PARTIAL = 'partial'
+
+# Counters for the whole run, printed by planner_report()
+planner_stats = {'segments': 0, 'passthrough': 0, 'partial': 0, 'placeholders_lost': 0,
+                 'chars_total': 0, 'chars_sent': 0, 'chars_placeholders': 0,
+                 'requests_unplanned': 0, 'requests_planned': 0}
+
+# Whole alphabetic words of at least two letters; parts of mixed tokens such as
+# "H5N1" or "PM-KISAN" don't count
+PLAIN_WORD = re.compile(r'(?<![\w-])[A-Za-z]{2,}(?![\w-])')
+
+def is_shouting(text):
+    """True for all-caps text such as "KEY POINTS", where capitals are not acronyms."""
+    words = PLAIN_WORD.findall(text)
+    return len(words) >= 2 and all(word.isupper() for word in words)
+
+def classify_segment(text):
+    """
+    Decide how an English segment should be translated.
+
+    - passthrough: nothing to translate (empty, already Gujarati, or only numbers,
+      dates, URLs and acronyms); the segment is used as it is
+    - partial: numbers, URLs and acronyms are replaced with placeholders before
+      translation and restored afterwards
+    - translate: sent as it is
+
+    Args:
+        text: English segment
+
+    Returns:
+        tuple: (action, text to send or None, list of protected tokens)
+    """
+    if not text.strip():
+        return PASSTHROUGH, None, []
+
+    gujarati = len(GUJARATI_CHAR.findall(text))
+    if gujarati and gujarati >= len(LATIN_CHAR.findall(text)):
+        return PASSTHROUGH, None, []
+
+    shouting = is_shouting(text)
+    residue = URL.sub(' ', text)
+    residue = NUMBER.sub(' ', residue)
+    if not shouting:
+        residue = ACRONYM.sub(' ', residue)
+    if NUMBER.search(text):
+        # Month names only count as "no text" when they are part of a date
+        residue = MONTH.sub(' ', residue)
+    if not LATIN_CHAR.search(residue):
+        return PASSTHROUGH, None, []
+
+    # Text that already contains something looking like a placeholder is sent as it is
+    if PLACEHOLDER_PATTERN.search(text):
+        return TRANSLATE, text, []
+
+    tokens = []
+
+    def protect(match):
+        tokens.append(match.group(0))
+        return PLACEHOLDER.format(len(tokens) - 1)
+
+    protected = (PROTECTED_NO_ACRONYMS if shouting else PROTECTED).sub(protect, text)
+    if not tokens:
+        return TRANSLATE, text, []
+    return PARTIAL, protected, tokens
+
+def needs_translation(text):
+    """Check whether a segment is expected to change when translated."""
+    return classify_segment(text)[0] != PASSTHROUGH
+
+def restore_placeholders(translated, tokens):
+    """
+    Put protected tokens back into a translated segment.
+
+    Returns:
+        str: Restored text, or None if a placeholder went missing in translation
+    """
+    found = []
+
+    def restore(match):
+        index = int(match.group(1).translate(GUJARATI_DIGITS))
+        if index >= len(tokens):
+            return match.group(0)
+        found.append(index)
+        return tokens[index]
+
+    restored = PLACEHOLDER_PATTERN.sub(restore, translated)
+    if sorted(found) != list(range(len(tokens))):
+        return None
+    return restored
+
+class TranslationPlan:
+    """
+    Translation plan for a list of segments.
+
+    Attributes:
+        segments: Original English segments
+        actions: translate / passthrough / partial for each segment
+        request_texts: Text to send for each segment (None for passthrough)
+        tokens: Protected tokens of each partial segment
+    """
+
+    def __init__(self, segments):
+        self.segments = list(segments)
+        self.actions = []
+        self.request_texts = []
+        self.tokens = []
+        for segment in self.segments:
+            action, request_text, tokens = classify_segment(segment)
+            self.actions.append(action)
+            self.request_texts.append(request_text)
+            self.tokens.append(tokens)
+
+        planner_stats['segments'] += len(self.segments)
+        planner_stats['passthrough'] += self.actions.count(PASSTHROUGH)
+        planner_stats['partial'] += self.actions.count(PARTIAL)
+        planner_stats['chars_total'] += sum(len(segment) for segment in self.segments)
+        planner_stats['chars_sent'] += sum(len(text) for text in self.request_texts if text)
+        planner_stats['chars_placeholders'] += sum(len(PLACEHOLDER.format(index))
+                                                   for tokens in self.tokens for index in range(len(tokens)))
+
+    def indexes_to_send(self):
+        """Indexes of the segments that need a translation request."""
+        return [index for index, text in enumerate(self.request_texts) if text is not None]
+
+    def restore(self, translations):
+        """
+        Build the final translations.
+
+        Args:
+            translations: dict of segment index -> translated request text
+
+        Returns:
+            tuple: (list of results, list of indexes whose placeholders were lost and
+                    must be translated again without protection)
+        """
+        results = []
+        lost = []
+        for index, segment in enumerate(self.segments):
+            action = self.actions[index]
+            if action == PASSTHROUGH:
+                results.append(segment if segment.strip() else '')
+            elif action == PARTIAL:
+                restored = restore_placeholders(translations[index], self.tokens[index])
+                if restored is None:
+                    lost.append(index)
+                    planner_stats['placeholders_lost'] += 1
+                results.append(restored)
+            else:
+                results.append(translations[index])
+        return results, lost
+
+def planner_report():
+    """Print what the planner saved in this run."""
+    stats = planner_stats
+    if not stats['segments']:
+        return
+    # Placeholders replace protected tokens and can be longer than them ("[0]" for "5"),
+    # so they are left out of the saving
+    saved_chars = stats['chars_total'] - (stats['chars_sent'] - stats['chars_placeholders'])
+    saved_requests = stats['requests_unplanned'] - stats['requests_planned']
+    print("Translation planner statistics:")
+    print(f"  • Segments: {stats['segments']}, passed through: {stats['passthrough']}, "
+          f"with protected tokens: {stats['partial']} (placeholders lost: {stats['placeholders_lost']})")
+    print(f"  • Characters sent: {stats['chars_sent']} of {stats['chars_total']} ({saved_chars} saved, "
+          f"{stats['chars_placeholders']} in placeholders)")
+    print(f"  • Requests: {stats['requests_planned']} instead of {stats['requests_unplanned']} ({saved_requests} saved)")
@@ -0,0 +1,151 @@
+"""
+Local translation stub server for testing and benchmarking without the real service.
+
+It answers POST /translate with {"q": [texts]} by returning {"translations": [...]},
+after a configurable latency, and simulates rate limiting (429 with Retry-After)
+and random server failures (503).
+
+    python translation_stub.py --port 8790 --latency 0.3 --rate 10 --failure-rate 0.02
+    TRANSLATION_BACKEND=stub python main.py
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubTranslationServer(ThreadingHTTPServer):
+    """
+    HTTP server simulating a translation provider.
+
+    Args:
+        address: (host, port) to listen on
+        latency: Base seconds per request
+        jitter: Extra random seconds per request (uniform 0..jitter)
+        per_char_latency: Extra seconds per character of input
+        rate: Requests per second allowed before answering 429 (0 for no limit)
+        failure_rate: Fraction of requests answered with 503
+        max_chars: Requests with more characters are rejected with 413
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.2, jitter=0.1, per_char_latency=0.0, rate=0,
+                 failure_rate=0.0, max_chars=5000):
+        super().__init__(address, StubTranslationHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.per_char_latency = per_char_latency
+        self.rate = rate
+        self.failure_rate = failure_rate
+        self.max_chars = max_chars
+        self.tokens = float(rate)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'segments': 0, 'rate_limited': 0, 'failed': 0}
+
+    def take_token(self):
+        """Token bucket for the simulated rate limit; False means answer 429."""
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+def fake_translate(text):
+    """Deterministic stand-in for a translation."""
+    return f"[gu] {text}"
+
+class StubTranslationHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, payload=None, headers=None):
+        body = json.dumps(payload or {}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        if self.path != '/translate':
+            self._reply(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            texts = json.loads(self.rfile.read(length))['q']
+        except (ValueError, KeyError):
+            self._reply(400, {'error': 'expected {"q": [texts]}'})
+            return
+
+        with server.lock:
+            server.stats['requests'] += 1
+        if not server.take_token():
+            with server.lock:
+                server.stats['rate_limited'] += 1
+            self._reply(429, {'error': 'rate limited'}, {'Retry-After': '1'})
+            return
+        if random.random() < server.failure_rate:
+            with server.lock:
+                server.stats['failed'] += 1
+            self._reply(503, {'error': 'simulated failure'})
+            return
+        chars = sum(len(text) for text in texts)
+        if chars > server.max_chars:
+            self._reply(413, {'error': f'more than {server.max_chars} characters'})
+            return
+
+        time.sleep(server.latency + random.uniform(0, server.jitter) + chars * server.per_char_latency)
+        with server.lock:
+            server.stats['segments'] += len(texts)
+        self._reply(200, {'translations': [fake_translate(text) for text in texts]})
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(host='127.0.0.1', port=0, **options):
+    """
+    Start a stub server in a background thread.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+        **options: StubTranslationServer options
+
+    Returns:
+        StubTranslationServer: The running server (its URL is http://host:server.server_port)
+    """
+    server = StubTranslationServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local translation stub server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--latency', type=float, default=0.2, help="Base seconds per request")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Random extra seconds per request")
+    parser.add_argument('--per-char-latency', type=float, default=0.0, help="Extra seconds per input character")
+    parser.add_argument('--rate', type=float, default=0, help="Requests per second before 429 (0 = unlimited)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    server = StubTranslationServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                                   per_char_latency=args.per_char_latency, rate=args.rate,
+                                   failure_rate=args.failure_rate)
+    print(f"Translation stub listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Stub statistics: {server.stats}")
+
+if __name__ == "__main__":
+    main()
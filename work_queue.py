@@ -0,0 +1,308 @@
+"""
+Lease-based work queue in MongoDB for processing one edition's articles on several machines.
+
+The node that crawls the listing enqueues one job per article URL and assembles the
+PDF from the results; any number of workers claim jobs, process them and write the
+finished article_info back:
+
+    python main.py --queue assemble --batch 2026-10-18     # crawl, work, then render and send
+    python main.py --queue work --batch 2026-10-18         # on every other machine
+
+A claimed job carries a lease that expires after WORK_QUEUE_LEASE_SECONDS unless
+the worker heartbeats, so the job of a worker that died mid-article is claimed
+again by another worker.
+"""
+import os
+import uuid
+import socket
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pymongo
+from pymongo import ReturnDocument, UpdateOne
+from db_utils import mongo_manager, scraped_url_writer
+from image_pipeline import to_data_uri
+from image_store import EXTENSIONS, path_from_uri
+from scraper import create_session, scrape_and_get_content
+from config import (ARTICLE_CONCURRENCY, ARTICLE_TIMEOUT, WORK_QUEUE_COLLECTION, WORK_QUEUE_LEASE_SECONDS,
+                    WORK_QUEUE_MAX_ATTEMPTS, WORK_QUEUE_POLL_INTERVAL, WORK_QUEUE_RETENTION_DAYS)
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+def utc_now():
+    # Leases are compared across machines, so times are always UTC
+    return datetime.now(timezone.utc)
+
+class WorkQueue:
+    """
+    Article jobs in a MongoDB collection, one document per (batch, url):
+
+        {batch, url, index, status, attempts, worker, lease_id, lease_expires,
+         result, error, created_at, finished_at}
+
+    claim() atomically moves the first pending job, or a leased job whose lease has
+    expired, to "leased" with find_one_and_update. Every later write is conditional
+    on the lease_id of that claim, so a worker that lost its lease cannot overwrite
+    the job. Jobs that fail max_attempts times are marked "failed", and finished
+    batches are removed by a TTL index after retention_days.
+    """
+
+    def __init__(self, manager=mongo_manager, collection=WORK_QUEUE_COLLECTION,
+                 lease_seconds=WORK_QUEUE_LEASE_SECONDS, max_attempts=WORK_QUEUE_MAX_ATTEMPTS,
+                 retention_days=WORK_QUEUE_RETENTION_DAYS, worker_id=None):
+        self.manager = manager
+        self.collection_name = collection
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.retention_days = retention_days
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._collection = None
+
+    def collection(self):
+        """
+        Return the jobs collection, creating its indexes on first use.
+
+        Raises:
+            RuntimeError: If MongoDB is not available
+        """
+        if self._collection is None:
+            client, _ = self.manager.connect()
+            if client is None:
+                raise RuntimeError("The work queue needs MongoDB, which is not available")
+            collection = client[self.manager.database_name][self.collection_name]
+            collection.create_index([("batch", pymongo.ASCENDING), ("url", pymongo.ASCENDING)], unique=True)
+            collection.create_index([("batch", pymongo.ASCENDING), ("status", pymongo.ASCENDING),
+                                     ("index", pymongo.ASCENDING)])
+            collection.create_index([("created_at", pymongo.ASCENDING)],
+                                    expireAfterSeconds=self.retention_days * 24 * 3600)
+            self._collection = collection
+        return self._collection
+
+    def enqueue(self, batch, urls):
+        """
+        Add one job per URL; URLs already in the batch keep their job and result.
+
+        Returns:
+            int: Number of new jobs
+        """
+        if not urls:
+            return 0
+        now = utc_now()
+        requests = [UpdateOne({"batch": batch, "url": url},
+                              {"$setOnInsert": {"index": index, "status": PENDING, "attempts": 0,
+                                                "created_at": now}},
+                              upsert=True)
+                    for index, url in enumerate(urls)]
+        result = self.collection().bulk_write(requests, ordered=False)
+        return result.upserted_count
+
+    def claim(self, batch):
+        """
+        Lease the next job of a batch.
+
+        Returns:
+            dict: The job document, or None if no job can be claimed right now
+        """
+        now = utc_now()
+        return self.collection().find_one_and_update(
+            {"batch": batch,
+             "attempts": {"$lt": self.max_attempts},
+             "$or": [{"status": PENDING},
+                     {"status": LEASED, "lease_expires": {"$lt": now}}]},
+            {"$set": {"status": LEASED, "worker": self.worker_id, "lease_id": uuid.uuid4().hex,
+                      "lease_expires": now + self.lease},
+             "$inc": {"attempts": 1}},
+            sort=[("index", pymongo.ASCENDING)],
+            return_document=ReturnDocument.AFTER)
+
+    def _update_leased(self, job, update):
+        result = self.collection().update_one(
+            {"_id": job["_id"], "status": LEASED, "lease_id": job["lease_id"]}, update)
+        return result.matched_count == 1
+
+    def heartbeat(self, job):
+        """
+        Extend the lease of a job being processed.
+
+        Returns:
+            bool: False if the lease was lost (expired and claimed by another worker)
+        """
+        return self._update_leased(job, {"$set": {"lease_expires": utc_now() + self.lease}})
+
+    def complete(self, job, result):
+        """Store the finished article_info of a job; returns False if the lease was lost."""
+        return self._update_leased(job, {"$set": {"status": DONE, "result": result, "finished_at": utc_now()},
+                                         "$unset": {"lease_expires": "", "lease_id": ""}})
+
+    def fail(self, job, error):
+        """Give a job back for another attempt, or mark it failed after max_attempts."""
+        status = FAILED if job["attempts"] >= self.max_attempts else PENDING
+        return self._update_leased(job, {"$set": {"status": status, "error": error},
+                                         "$unset": {"lease_expires": "", "lease_id": ""}})
+
+    def progress(self, batch):
+        """
+        Count the jobs of a batch by status. Jobs whose last lease expired after
+        their final attempt can never be claimed again and count as failed.
+
+        Returns:
+            dict: status -> number of jobs
+        """
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        now = utc_now()
+        for job in self.collection().find({"batch": batch},
+                                          {"status": 1, "attempts": 1, "lease_expires": 1, "_id": 0}):
+            status = job["status"]
+            if status == LEASED and job.get("attempts", 0) >= self.max_attempts and \
+                    job["lease_expires"].replace(tzinfo=timezone.utc) < now:
+                status = FAILED
+            counts[status] += 1
+        return counts
+
+    def results(self, batch):
+        """
+        Return the finished jobs of a batch in the order the URLs were enqueued.
+
+        Returns:
+            list: (url, article_info) tuples
+        """
+        cursor = self.collection().find({"batch": batch, "status": DONE},
+                                        {"url": 1, "result": 1, "_id": 0}).sort("index", pymongo.ASCENDING)
+        return [(job["url"], job["result"]) for job in cursor]
+
+def portable_article(article_info):
+    """
+    Inline an image stored on this machine as a data URI, so the result can be
+    rendered by an assembler on another machine.
+    """
+    image = article_info.get('image')
+    if image and image.startswith('file:'):
+        path = path_from_uri(image)
+        mime_type = next((mime for mime, extension in EXTENSIONS.items() if path.endswith(extension)), 'image/jpeg')
+        with open(path, 'rb') as f:
+            article_info = dict(article_info, image=to_data_uri(f.read(), mime_type))
+    return article_info
+
+async def keep_lease(queue, job, task):
+    """Heartbeat a job's lease while it is processed; cancel the task if the lease is lost."""
+    while True:
+        await asyncio.sleep(queue.lease.total_seconds() / 3)
+        if not await asyncio.to_thread(queue.heartbeat, job):
+            print(f"  ✗ Lease lost for {job['url']}, another worker has taken the job")
+            task.cancel()
+            return
+
+async def process_job(queue, session, job, timeout=ARTICLE_TIMEOUT):
+    """
+    Process one claimed job and write its result back.
+
+    Returns:
+        bool: True if the article was processed and stored
+    """
+    url = job['url']
+    print(f"\nProcessing job {job['index'] + 1} (attempt {job['attempts']}): {url}")
+    task = asyncio.ensure_future(asyncio.wait_for(scrape_and_get_content(url, session), timeout))
+    heartbeat = asyncio.ensure_future(keep_lease(queue, job, task))
+    try:
+        article_info = await task
+        error = None if article_info else "article could not be processed"
+    except asyncio.TimeoutError:
+        article_info, error = None, f"timed out after {timeout} seconds"
+    except asyncio.CancelledError:
+        if heartbeat.done():
+            # Lease lost: the job belongs to another worker now
+            return False
+        raise
+    finally:
+        heartbeat.cancel()
+
+    if article_info:
+        try:
+            result = portable_article(article_info)
+        except OSError as e:
+            result, error = None, f"image not readable: {str(e)}"
+        if result and await asyncio.to_thread(queue.complete, job, result):
+            print(f"✓ Job done: {article_info['english_title']}")
+            return True
+    print(f"✗ Job failed: {url} ({error or 'lease lost'})")
+    await asyncio.to_thread(queue.fail, job, error or 'lease lost')
+    return False
+
+async def run_queue_worker(batch, queue=None, concurrency=ARTICLE_CONCURRENCY, poll_interval=WORK_QUEUE_POLL_INTERVAL):
+    """
+    Claim and process jobs of a batch until none are pending or leased.
+    Leased jobs of other workers are waited for, since their leases may expire.
+
+    Returns:
+        int: Number of jobs this worker completed
+    """
+    queue = queue or work_queue
+    print(f"\n{'='*80}")
+    print(f"WORKING ON QUEUE BATCH {batch} as {queue.worker_id} ({concurrency} at a time)")
+    print(f"{'='*80}")
+    completed = 0
+
+    async def worker_slot(session):
+        nonlocal completed
+        while True:
+            job = await asyncio.to_thread(queue.claim, batch)
+            if job is None:
+                counts = await asyncio.to_thread(queue.progress, batch)
+                if not counts[PENDING] and not counts[LEASED]:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            if await process_job(queue, session, job):
+                completed += 1
+
+    async with create_session(concurrency * 2) as session:
+        await asyncio.gather(*(worker_slot(session) for _ in range(concurrency)))
+
+    counts = await asyncio.to_thread(queue.progress, batch)
+    print(f"\nQueue batch {batch}: {counts[DONE]} done, {counts[FAILED]} failed; "
+          f"{completed} completed by this worker")
+    return completed
+
+async def assemble_from_queue(batch, urls, queue=None, work=True):
+    """
+    Enqueue the URLs of an edition, help process them, wait for the other workers
+    and collect the results for rendering.
+
+    Args:
+        batch: Batch name shared with the workers
+        urls: Article URLs found by the crawl
+        queue: WorkQueue (defaults to the shared one)
+        work: Process jobs on this machine too
+
+    Returns:
+        tuple: (articles, titles) in the original URL order
+    """
+    queue = queue or work_queue
+    added = await asyncio.to_thread(queue.enqueue, batch, urls)
+    print(f"Queued {added} new jobs in batch {batch} ({len(urls) - added} already queued)")
+    if work:
+        await run_queue_worker(batch, queue)
+    while True:
+        counts = await asyncio.to_thread(queue.progress, batch)
+        if not counts[PENDING] and not counts[LEASED]:
+            break
+        print(f"  • Waiting for workers: {counts[PENDING]} pending, {counts[LEASED]} in progress")
+        await asyncio.sleep(WORK_QUEUE_POLL_INTERVAL)
+
+    wanted = set(urls)
+    articles = []
+    titles = []
+    for url, article_info in await asyncio.to_thread(queue.results, batch):
+        if url not in wanted:
+            continue
+        articles.append(article_info)
+        titles.append(article_info['english_title'])
+        # Recorded as scraped once the edition is published, like locally processed articles
+        scraped_url_writer.add(url)
+    print(f"Collected {len(articles)} of {len(urls)} articles from the queue ({counts[FAILED]} failed)")
+    return articles, titles
+
+# Shared queue used by main.py --queue
+work_queue = WorkQueue()